@@ -41,45 +41,57 @@ async def play_video_from_channel_on_obs(ctx, bot, *args):
         await ctx.channel.send(bot.config.get_message('bot.invalid_command_format'))
         return
 
-    # Process each valid channel
+    # Broadcaster and moderator shoutouts skip ahead of the ones from other authorized users
+    priority = 'high' if ctx.author.is_broadcaster or ctx.author.is_mod else 'normal'
+
+    # Send all valid channels in one request so their IDs are resolved in a single batch
     try:
         connector = aiohttp.TCPConnector(ssl=False)
         async with aiohttp.ClientSession(connector=connector) as session:
-            for i, channel_name in enumerate(valid_channels):
-                try:
-                    async with session.post(
-                        'https://localhost:5000/play',
-                        json={'channel': channel_name},
-                        timeout=35
-                    ) as response:
-                        if response.status == 200:
-                            bot.command_logger.log_command(
-                                command='so',
-                                channel=channel_name.lower(),
-                                requester=ctx.author.name
-                            )
-                            response_data = await response.json()
-                            queue_position = response_data.get('queue_position', 1)
+            async with session.post(
+                'https://localhost:5000/play',
+                json={'channels': valid_channels, 'priority': priority},
+                timeout=35
+            ) as response:
+                if response.status == 429:
+                    # Queue is full: the error is already a localized chat message
+                    await ctx.channel.send((await response.json()).get('error'))
+                    return
+
+                if response.status != 200:
+                    error_msg = (await response.json()).get('error', 'Erro desconhecido')
+                    await ctx.channel.send(f"❌ Erro com canal '{', '.join(valid_channels)}': {error_msg}")
+                    return
+
+                response_data = await response.json()
+                queue_positions = response_data.get('queue_positions', [1] * len(valid_channels))
+                queue_statuses = response_data.get('queue_statuses', ['queued'] * len(valid_channels))
+                messages = response_data.get('messages', [])
+
+            for index, (channel_name, queue_position, queue_status) in enumerate(
+                    zip(valid_channels, queue_positions, queue_statuses)):
+                if queue_status != 'full':
+                    bot.command_logger.log_command(
+                        command='so',
+                        channel=channel_name.lower(),
+                        requester=ctx.author.name
+                    )
 
-                            if len(valid_channels) == 1:
-                                # Single channel - use original messages
-                                if queue_position > 1:
-                                    await ctx.channel.send(bot.config.get_message('bot.add_to_queue', channel_name=channel_name, queue_position=queue_position))
-                                else:
-                                    await ctx.channel.send(bot.config.get_message('bot.playing_now', channel_name=channel_name))
-                            else:
-                                # Multiple channels - use custom messages
-                                if queue_position > 1:
-                                    await ctx.channel.send(f"📺 Canal '{channel_name}' adicionado à fila (posição {queue_position})")
-                                else:
-                                    await ctx.channel.send(f"🎬 Tocando canal '{channel_name}' agora!")
-                        else:
-                            error_msg = (await response.json()).get('error', 'Erro desconhecido')
-                            await ctx.channel.send(f"❌ Erro com canal '{channel_name}': {error_msg}")
-                            
-                except Exception as e:
-                    print(f"Error processing channel {channel_name}: {str(e)}")
-                    await ctx.channel.send(f"❌ Erro ao processar canal '{channel_name}'")
+                if queue_status != 'queued' and index < len(messages):
+                    # Already queued or rejected: use the server's localized message
+                    await ctx.channel.send(messages[index])
+                elif len(valid_channels) == 1:
+                    # Single channel - use original messages
+                    if queue_position > 1:
+                        await ctx.channel.send(bot.config.get_message('bot.add_to_queue', channel_name=channel_name, queue_position=queue_position))
+                    else:
+                        await ctx.channel.send(bot.config.get_message('bot.playing_now', channel_name=channel_name))
+                else:
+                    # Multiple channels - use custom messages
+                    if queue_position > 1:
+                        await ctx.channel.send(f"📺 Canal '{channel_name}' adicionado à fila (posição {queue_position})")
+                    else:
+                        await ctx.channel.send(f"🎬 Tocando canal '{channel_name}' agora!")
 
             # Send summary message for multiple channels
             if len(valid_channels) > 1:
@@ -0,0 +1,73 @@
+"""
+Memory per cached channel: raw Helix dicts (the previous cache layout) vs ContentItem.
+
+Builds a content list of realistic clip and video payloads for many channels and reports
+the bytes traced by tracemalloc for each layout.
+
+Run from the repository root: python benchmarks/bench_content_memory.py [--channels 50]
+"""
+import argparse
+import tracemalloc
+
+from helix_stub import so_bot
+
+
+def clip_payload(channel: int, i: int) -> dict:
+    slug = f'AwkwardHelplessSalamanderSwiftRage-{channel:04d}{i:06d}'
+    return {
+        'id': slug, 'url': f'https://clips.twitch.tv/{slug}', 'embed_url': f'https://clips.twitch.tv/embed?clip={slug}',
+        'broadcaster_id': f'{67955580 + channel}', 'broadcaster_name': f'Channel{channel}',
+        'creator_id': '53834192', 'creator_name': 'BlackNova03', 'video_id': '205586603', 'game_id': '488191',
+        'language': 'en', 'title': f'Clip number {i}', 'view_count': 10 + i, 'created_at': '2017-11-30T22:34:18Z',
+        'thumbnail_url': f'https://clips-media-assets.twitch.tv/{slug}-preview-480x272.jpg',
+        'duration': 28.3, 'vod_offset': 1957, 'is_featured': False,
+    }
+
+
+def video_payload(channel: int, i: int) -> dict:
+    video_id = f'{2000000000 + channel * 1000 + i}'
+    return {
+        'id': video_id, 'stream_id': '40339817131', 'user_id': f'{67955580 + channel}', 'user_login': f'channel{channel}',
+        'user_name': f'Channel{channel}', 'title': f'Highlight number {i}', 'description': '',
+        'created_at': '2023-05-01T18:00:00Z', 'published_at': '2023-05-01T18:00:00Z',
+        'url': f'https://www.twitch.tv/videos/{video_id}',
+        'thumbnail_url': f'https://static-cdn.jtvnw.net/cf_vods/{video_id}/thumb/thumb0-%{{width}}x%{{height}}.jpg',
+        'viewable': 'public', 'view_count': 100 + i, 'language': 'en', 'type': 'highlight', 'duration': '25s',
+        'muted_segments': None,
+    }
+
+
+def as_dicts(channel: int, clips: int, videos: int) -> list:
+    return ([dict(clip_payload(channel, i), content_type='clip', duration_seconds=28.3) for i in range(clips)]
+            + [dict(video_payload(channel, i), content_type='highlight', duration_seconds=25) for i in range(videos)])
+
+
+def as_items(channel: int, clips: int, videos: int) -> list:
+    return ([so_bot.ContentItem.from_clip(clip_payload(channel, i)) for i in range(clips)]
+            + [so_bot.ContentItem.from_video(video_payload(channel, i), 'highlight', 25) for i in range(videos)])
+
+
+def measure(build, channels: int, clips: int, videos: int) -> int:
+    tracemalloc.start()
+    cache = {str(channel): build(channel, clips, videos) for channel in range(channels)}
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--channels', type=int, default=50)
+    parser.add_argument('--clips', type=int, default=100, help='clips per channel')
+    parser.add_argument('--videos', type=int, default=20, help='videos per channel')
+    args = parser.parse_args()
+
+    before = measure(as_dicts, args.channels, args.clips, args.videos) / args.channels
+    after = measure(as_items, args.channels, args.clips, args.videos) / args.channels
+    print(f"dicts       {before:10.0f} bytes per channel")
+    print(f"ContentItem {after:10.0f} bytes per channel  ({after / before:.0%} of dicts)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Micro-benchmark of the Twitch duration parser against the implementation it replaced.
+
+Run from the repository root: python benchmarks/bench_duration_parser.py
+"""
+import os
+import random
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, 'tests')]
+
+import so_bot  # noqa: E402
+from test_duration_parser import legacy_interval_string_to_seconds  # noqa: E402
+
+
+def main():
+    rng = random.Random(0)
+    # Helix archive durations: many distinct values, each seen a few times across a channel's videos
+    durations = [f"{rng.randint(0, 12)}h{rng.randint(0, 59)}m{rng.randint(0, 59)}s" for _ in range(3000)]
+    repeat = 20
+
+    def run(parse):
+        for value in durations:
+            parse(value)
+
+    legacy = timeit.timeit(lambda: run(legacy_interval_string_to_seconds), number=repeat)
+    uncached = timeit.timeit(lambda: run(so_bot._parse_twitch_duration.__wrapped__), number=repeat)
+    so_bot._parse_twitch_duration.cache_clear()
+    memoized = timeit.timeit(lambda: run(so_bot._parse_twitch_duration), number=repeat)
+
+    calls = len(durations) * repeat
+    for name, seconds in (('previous', legacy), ('new, uncached', uncached), ('new, memoized', memoized)):
+        print(f"{name:<15} {seconds:.3f} s  ({seconds / calls * 1e6:.2f} us/call)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Cursor vs sharded clip fetching against the Helix stand-in with per-request latency.
+
+A strict MAX_VIDEO_TIME keeps few clips per page, so the cursor mode walks a long
+sequential chain of pages while the sharded mode issues its time windows concurrently.
+
+Run from the repository root: python benchmarks/bench_sharded_clips.py [--latency 0.1]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from helix_stub import HelixStub, make_config, so_bot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds per Helix request')
+    parser.add_argument('--clips', type=int, default=2000, help='clips in the channel history')
+    parser.add_argument('--max-video-time', default='14', help='MAX_VIDEO_TIME in seconds')
+    args = parser.parse_args()
+
+    stub = HelixStub(latency=args.latency, clips=args.clips)
+    stub.install(stub.start())
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ('cursor', 'sharded'):
+            config = make_config(directory, CLIP_FETCH_MODE=mode, MAX_VIDEO_TIME=args.max_video_time, HELIX_CONCURRENCY=8)
+            api = so_bot.TwitchAPI(config, so_bot.TokenManager(config, os.path.join(directory, 'tokens.yaml')))
+            api.start()
+            try:
+                # Resolve the channel first: the token and the account creation date are not what is measured
+                user_id = api.run(api.get_channel_id('benchmark_channel'))
+                before = stub.calls['clips']
+                start = time.perf_counter()
+                clips = api.run(api.get_channel_clips(user_id))
+                seconds = time.perf_counter() - start
+                print(f"{mode:<8} {seconds * 1000:8.1f} ms  {len(clips)} clips  {stub.calls['clips'] - before} requests")
+            finally:
+                api.close()
+    stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Cold vs warm first-shoutout latency with the SQLite cache backend.
+
+The first run starts from an empty cache database and resolves a channel through the
+Helix stand-in; the second run is a fresh TwitchAPI (as after a bot restart) reading
+the same database.
+
+Run from the repository root: python benchmarks/bench_sqlite_cache.py [--latency 0.05]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from helix_stub import HelixStub, make_config, so_bot
+
+
+def first_shoutout(config, tokens_path: str, channel: str):
+    api = so_bot.TwitchAPI(config, so_bot.TokenManager(config, tokens_path))
+    api.start()
+    try:
+        start = time.perf_counter()
+        user_id = api.run(api.get_channel_id(channel))
+        content = api.run(api.get_channel_content(user_id))
+        return time.perf_counter() - start, len(content)
+    finally:
+        api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per Helix request')
+    args = parser.parse_args()
+
+    stub = HelixStub(latency=args.latency)
+    stub.install(stub.start())
+    with tempfile.TemporaryDirectory() as directory:
+        config = make_config(directory, CACHE_BACKEND='sqlite', CACHE_DB_PATH=os.path.join(directory, 'cache.db'))
+        tokens_path = os.path.join(directory, 'tokens.yaml')
+        for run in ('cold', 'warm'):
+            before = sum(stub.calls.values())
+            seconds, items = first_shoutout(config, tokens_path, 'benchmark_channel')
+            print(f"{run:<5} {seconds * 1000:8.1f} ms  {items} items  {sum(stub.calls.values()) - before} Helix requests")
+    stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Local stand-in for the Twitch Helix and OAuth endpoints used by the benchmarks.
+
+Every request sleeps for a fixed latency before answering, so request counts and
+sequential round trips show up in wall-clock time the way they do against Twitch.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import so_bot  # noqa: E402
+
+
+def rfc3339(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def parse_rfc3339(value: str) -> float:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+class HelixStub:
+    """Helix stand-in serving synthetic users, clips and videos on a background loop"""
+    def __init__(self, latency: float = 0.05, clips: int = 400, videos: int = 1000,
+                 created_at: str = '2015-01-01T00:00:00Z'):
+        self.latency = latency
+        self.created_at = created_at
+        self.calls = Counter()
+        start = parse_rfc3339(created_at)
+        step = (time.time() - start) / max(1, clips)
+        # Clips spread over the channel's history, 10-49 seconds long
+        self.clips = [{
+            'id': f'clip{i}',
+            'url': f'https://clips.twitch.tv/clip{i}',
+            'embed_url': f'https://clips.twitch.tv/embed?clip=clip{i}',
+            'title': f'Clip {i}',
+            'duration': 10 + i % 40,
+            'view_count': clips - i,
+            'created_at': rfc3339(start + i * step),
+            'thumbnail_url': f'https://clips-media-assets.twitch.tv/clip{i}-preview-480x272.jpg',
+        } for i in range(clips)]
+        # Mostly long archives with a short one every ten videos
+        self.videos = [{
+            'id': str(i),
+            'url': f'https://www.twitch.tv/videos/{i}',
+            'title': f'Video {i}',
+            'duration': '25s' if i % 10 == 0 else '1h2m3s',
+            'view_count': videos - i,
+            'created_at': rfc3339(start + i),
+        } for i in range(videos)]
+        self.loop = None
+        self._runner = None
+
+    def start(self) -> str:
+        """Serve on a free local port from a daemon thread and return the base URL"""
+        self.loop = asyncio.new_event_loop()
+        self._runner = web.AppRunner(self._make_app())
+        self.loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        self.loop.run_until_complete(site.start())
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        host, port = self._runner.addresses[0][:2]
+        return f'http://{host}:{port}'
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def install(self, base_url: str):
+        """Point so_bot at this stand-in"""
+        so_bot.HELIX_BASE_URL = base_url + '/helix'
+        so_bot.TWITCH_TOKEN_URL = base_url + '/oauth2/token'
+
+    def _make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/oauth2/token', self._token)
+        app.router.add_get('/helix/users', self._users)
+        app.router.add_get('/helix/clips', self._clips)
+        app.router.add_get('/helix/videos', self._videos)
+        return app
+
+    async def _respond(self, endpoint: str, payload: dict) -> web.Response:
+        self.calls[endpoint] += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response(payload)
+
+    async def _token(self, request):
+        return await self._respond('token', {'access_token': 'app', 'expires_in': 3600, 'token_type': 'bearer'})
+
+    async def _users(self, request):
+        data = [{'id': str(1000 + sum(map(ord, login))), 'login': login, 'created_at': self.created_at}
+                for login in request.query.getall('login', [])]
+        return await self._respond('users', {'data': data})
+
+    def _page(self, request, items):
+        first = min(100, int(request.query.get('first', 20)))
+        offset = int(request.query.get('after', 0))
+        page = items[offset:offset + first]
+        cursor = {'cursor': str(offset + first)} if offset + first < len(items) else {}
+        return {'data': page, 'pagination': cursor}
+
+    async def _clips(self, request):
+        clips = self.clips
+        if 'started_at' in request.query:
+            started_at = parse_rfc3339(request.query['started_at'])
+            ended_at = parse_rfc3339(request.query['ended_at'])
+            clips = [c for c in clips if started_at <= parse_rfc3339(c['created_at']) < ended_at]
+        return await self._respond('clips', self._page(request, clips))
+
+    async def _videos(self, request):
+        return await self._respond('videos', self._page(request, self.videos))
+
+
+def make_config(directory: str, **overrides) -> so_bot.Config:
+    """Default configuration stored in directory; language files are read from the repository"""
+    os.chdir(REPO_ROOT)
+    config = so_bot.Config(os.path.join(directory, 'config.yaml'))
+    config.config.update(overrides)
+    return config
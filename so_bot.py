@@ -12,21 +12,38 @@ import asyncio
 import threading
 import webbrowser
 import csv
-from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+import contextvars
+import functools
+import itertools
+import sys
+import json
+import queue
+import secrets
+import concurrent.futures
+import urllib.parse
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Tuple, Union
 import urllib3
 import aiohttp
+import asqlite
 import os # Import os to list language files
 import importlib
 
 # Disable warnings for insecure requests (necessary for self-signed certificates)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
 from obswebsocket import obsws, requests as obs_requests
 from twitchio.ext import commands
 
+HELIX_BASE_URL = 'https://api.twitch.tv/helix'
+TWITCH_TOKEN_URL = 'https://id.twitch.tv/oauth2/token'
+HELIX_USERS_BATCH_SIZE = 100
+CONTENT_CONFIG_KEYS = {'MAX_VIDEO_TIME', 'CONTENT_TYPES', 'CLIP_FETCH_MODE'}  # Settings that change content answers
+CLIPS_EPOCH = datetime(2016, 5, 1, tzinfo=timezone.utc).timestamp()  # Twitch clips launched in 2016
+
 
 class Config:
     """Class to manage application configuration"""
@@ -45,7 +62,61 @@ class Config:
         'AUTHORIZED_USERS': [],
         'CONTENT_TYPES': ['clip', 'video', 'highlight'],
         'LOG_FILE_PATH': 'command_log.csv',
-        'MAX_VIDEO_TIME': '30'
+        'MAX_VIDEO_TIME': '30',
+        'HELIX_POOL_LIMIT': 20,
+        'HELIX_POOL_LIMIT_PER_HOST': 10,
+        'HELIX_DNS_CACHE_TTL': 300,
+        'HELIX_KEEPALIVE_TIMEOUT': 60,
+        'HELIX_REQUEST_TIMEOUT': 15,
+        'APP_TOKEN_REFRESH_MARGIN': 300,
+        'USER_TOKEN_REFRESH_MARGIN': 300,
+        'HELIX_BATCH_WINDOW': 0.02,
+        'HELIX_CONCURRENCY': 4,
+        'CACHE_BACKEND': 'memory',
+        'CACHE_DB_PATH': 'cache.db',
+        'CONTENT_CACHE_SOFT_TTL': 300,
+        'CONTENT_CACHE_HARD_TTL': 3600,
+        'CONTENT_CACHE_SERVE_STALE': True,
+        'CONTENT_CACHE_MAX_ENTRIES': 200,
+        'CONTENT_CACHE_MAX_BYTES': 64 * 1024 * 1024,
+        'CHANNEL_ID_CACHE_TTL': 7 * 24 * 60 * 60,
+        'CHANNEL_ID_CACHE_MAX_ENTRIES': 5000,
+        'HELIX_MAX_PAGES': 10,
+        'HELIX_PAGE_TIME_BUDGET': 5.0,
+        'VIDEO_SAMPLE_SIZE': 100,
+        'YIELD_MIN_PROBES': 3,
+        'YIELD_SKIP_THRESHOLD': 0.005,
+        'YIELD_LOW_THRESHOLD': 0.05,
+        'YIELD_REPROBE_INTERVAL': 24 * 60 * 60,
+        'YIELD_DECAY': 0.5,
+        'CLIP_FETCH_MODE': 'cursor',
+        'CLIP_SHARDS': 8,
+        'HELIX_MAX_RETRIES': 3,
+        'HELIX_RETRY_BASE_DELAY': 0.5,
+        'HELIX_BACKGROUND_RESERVE': 100,
+        'NEGATIVE_CACHE_TTL': 120,
+        'NEGATIVE_CACHE_MAX_ENTRIES': 1000,
+        'PREFETCH_DEPTH': 3,
+        'WARMUP_ENABLED': True,
+        'WARMUP_TOP_N': 10,
+        'WARMUP_MAX_REQUESTS': 60,
+        'WARMUP_INTERVAL': 60 * 60,
+        'WARMUP_HALF_LIFE': 7 * 24 * 60 * 60,
+        'SPECULATIVE_PREFETCH': False,
+        'PREFETCH_ALLOWLIST': [],
+        'PREFETCH_KNOWN_TARGETS': True,
+        'PREFETCH_MAX_PER_HOUR': 20,
+        'PREFETCH_MAX_REQUESTS_PER_HOUR': 200,
+        'PREFETCH_CHATTER_TTL': 60 * 60,
+        'QUEUE_MAX_LENGTH': 20,
+        'QUEUE_JOURNAL_PATH': 'queue_journal.jsonl',
+        'QUEUE_JOURNAL_FLUSH_INTERVAL': 0.05,
+        'QUEUE_JOURNAL_COMPACT_EVERY': 500,
+        'QUEUE_EVENTS_KEEPALIVE': 15,
+        'PLAYER_PAGE': False,
+        'PLAYER_BASE_URL': 'https://localhost:5000',
+        'PLAYER_LOAD_TIMEOUT': 10,
+        'PLAYER_ENDED_TIMEOUT': 5
     }
 
     def __init__(self, config_path: str = "config.yaml"):
@@ -53,18 +124,16 @@ class Config:
         self.config_path = config_path
         self.config = self.load()
         self.messages = self._load_language_messages() # Load language messages
+        self._listeners: List[Callable[[List[str]], None]] = []
 
     def load(self) -> Dict[str, Any]:
         """Load configuration from file or use defaults"""
         try:
             with open(self.config_path, "r") as file:
-                config = yaml.safe_load(file)
-                # Set default if not exists
-                if 'BLOCKED_PERIOD' not in config:
-                    config['BLOCKED_PERIOD'] = '08-23'
-                # Ensure language is set if not present (for existing config files)
-                if 'LANGUAGE' not in config:
-                     config['LANGUAGE'] = self.DEFAULT_CONFIG['LANGUAGE']
+                config = yaml.safe_load(file) or {}
+                # Fill in defaults for keys missing from older config files
+                for key, value in self.DEFAULT_CONFIG.items():
+                    config.setdefault(key, value)
                 return config
         except FileNotFoundError:
             # If file not found, create it with default config and return default config
@@ -129,9 +198,17 @@ class Config:
         self.config[key] = value
 
     def update(self, new_config: Dict[str, Any]) -> None:
-        """Update configuration with new values"""
+        """Update configuration with new values and notify listeners of changed keys"""
+        changed_keys = [key for key, value in new_config.items() if self.config.get(key) != value]
         self.config.update(new_config)
         self.save()
+        if changed_keys:
+            for listener in self._listeners:
+                listener(changed_keys)
+
+    def add_listener(self, listener: Callable[[List[str]], None]) -> None:
+        """Register a callback receiving the keys changed by update()"""
+        self._listeners.append(listener)
 
 
 class TokenManager:
@@ -143,28 +220,57 @@ class TokenManager:
         self.tokens_path = tokens_path
         self.auth_complete_event = threading.Event()
 
+        # In-memory user token state, loaded from tokens_path on first use
+        self._tokens: Optional[Dict[str, Any]] = None
+        self._tokens_loaded = False
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # In-memory app access token cache
+        self._app_token: Optional[str] = None
+        self._app_token_expires_at = 0.0
+        self._app_token_task: Optional[asyncio.Task] = None
+
     def load_tokens(self) -> Optional[Dict[str, Any]]:
-        """Load tokens from file"""
-        try:
-            with open(self.tokens_path, "r") as f:
-                tokens = yaml.safe_load(f)
-                if tokens and 'access_token' in tokens and 'refresh_token' in tokens:
-                    return tokens
-        except FileNotFoundError:
-            pass
-        return None
+        """Get tokens from memory, reading the tokens file on first use"""
+        if not self._tokens_loaded:
+            try:
+                with open(self.tokens_path, "r") as f:
+                    tokens = yaml.safe_load(f)
+                    if tokens and 'access_token' in tokens and 'refresh_token' in tokens:
+                        self._tokens = tokens
+            except FileNotFoundError:
+                pass
+            self._tokens_loaded = True
+        return self._tokens
 
     def save_tokens(self, access_token: str, refresh_token: str, expires_in: int) -> None:
-        """Save tokens to file"""
+        """Save tokens to memory, writing the tokens file atomically when they change"""
+        current = self.load_tokens()
         tokens = {
             'access_token': access_token,
             'refresh_token': refresh_token,
             'expires_at': time.time() + expires_in
         }
-        with open(self.tokens_path, "w") as f:
+        self._tokens = tokens
+        if current and current['access_token'] == access_token and current['refresh_token'] == refresh_token:
+            return
+
+        tmp_path = f"{self.tokens_path}.tmp"
+        with open(tmp_path, "w") as f:
             yaml.dump(tokens, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.tokens_path)
 
     async def refresh_tokens(self) -> bool:
+        """Refresh tokens, sharing the result of any refresh already in flight"""
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._refresh_tokens())
+            self._refresh_task = task
+        return await asyncio.shield(task)
+
+    async def _refresh_tokens(self) -> bool:
         """Refresh tokens using the refresh token"""
         tokens = self.load_tokens()
         if not tokens or 'refresh_token' not in tokens:
@@ -173,7 +279,7 @@ class TokenManager:
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.post(
-                    'https://id.twitch.tv/oauth2/token',
+                    TWITCH_TOKEN_URL,
                     data={  # Changed from params to data
                         'client_id': self.config.get('TWITCH_CLIENT_ID'),
                         'client_secret': self.config.get('TWITCH_CLIENT_SECRET'),
@@ -196,38 +302,74 @@ class TokenManager:
     async def get_valid_token(self) -> Optional[str]:
         """Get a valid access token, refreshing if necessary"""
         tokens = self.load_tokens()
-        print(f"🔍 Tokens carregados: {bool(tokens)}")
-        
-        if tokens:
-            print(f"⏰ Token expira em: {tokens.get('expires_at', 'N/A')}")
-            print(f"🕐 Tempo atual: {time.time()}")
-            print(f"⏳ Diferença: {tokens.get('expires_at', 0) - time.time() if tokens.get('expires_at') else 'N/A'}")
-
         if tokens and tokens['expires_at'] > time.time() + 60:  # 1 minute margin
-            print("✅ Token ainda válido")
             return tokens['access_token']
 
         if tokens and await self.refresh_tokens(): # Made call async
-            print("🔄 Token renovado com sucesso")
             return self.load_tokens()['access_token']
 
-        print("❌ Token inválido ou ausente")
         return None
 
-    async def get_app_access_token(self) -> Optional[str]:
-        """Get an application access token for API requests"""
-        auth_url = 'https://id.twitch.tv/oauth2/token'
+    async def run_refresh_scheduler(self, on_refresh: Optional[Callable[[str], None]] = None) -> None:
+        """Refresh the user token shortly before it expires, for as long as the task runs"""
+        while True:
+            tokens = self.load_tokens()
+            if not tokens:
+                return
+
+            delay = tokens['expires_at'] - time.time() - int(self.config.get('USER_TOKEN_REFRESH_MARGIN'))
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            if await self.refresh_tokens():
+                print("🔄 Token renovado com sucesso")
+                if on_refresh:
+                    on_refresh(self.load_tokens()['access_token'])
+            else:
+                # Try again later; get_valid_token still refreshes lazily as a fallback
+                await asyncio.sleep(60)
+
+    async def get_app_access_token(self, session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
+        """Get a cached application access token, requesting a new one when it expires"""
+        now = time.time()
+        if self._app_token and self._app_token_expires_at > now:
+            # Refresh ahead of expiry in the background while the cached token is still valid
+            if self._app_token_expires_at - now < int(self.config.get('APP_TOKEN_REFRESH_MARGIN')):
+                self._start_app_token_request(session)
+            return self._app_token
+        return await asyncio.shield(self._start_app_token_request(session))
+
+    def invalidate_app_access_token(self) -> None:
+        """Drop the cached application access token (e.g. after a 401)"""
+        self._app_token = None
+        self._app_token_expires_at = 0.0
+
+    def _start_app_token_request(self, session: Optional[aiohttp.ClientSession]) -> asyncio.Task:
+        """Start an app token request unless one is already in flight on this loop"""
+        task = self._app_token_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._request_app_access_token(session))
+            self._app_token_task = task
+        return task
+
+    async def _request_app_access_token(self, session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
+        """Request a new application access token using client credentials"""
         params = {
             'client_id': self.config.get('TWITCH_CLIENT_ID'),
             'client_secret': self.config.get('TWITCH_CLIENT_SECRET'),
             'grant_type': 'client_credentials'
         }
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(auth_url, data=params) as response: # Changed from params to data
-                    response.raise_for_status()
-                    token_data = await response.json()
-                    return token_data.get('access_token')
+            if session is None:
+                async with aiohttp.ClientSession() as own_session:
+                    return await self._request_app_access_token(own_session)
+            async with session.post(TWITCH_TOKEN_URL, data=params) as response: # Changed from params to data
+                response.raise_for_status()
+                token_data = await response.json()
+            self._app_token = token_data.get('access_token')
+            self._app_token_expires_at = time.time() + token_data.get('expires_in', 0)
+            return self._app_token
         except Exception as e:
             print(f"Error getting app access token: {str(e)}")
             return None
@@ -275,6 +417,31 @@ class CommandLogger:
         except Exception as e:
             print(f"Error logging command: {str(e)}")
 
+    def rank_channels(self, command: str, half_life: float) -> List[Tuple[str, float]]:
+        """Rank logged channels of a command by frequency, each use decaying with age"""
+        log_file = self.config.get('LOG_FILE_PATH', 'command_log.csv')
+        now = datetime.now()
+        scores: Dict[str, float] = {}
+
+        try:
+            with open(log_file, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    if row.get('command') != command or not row.get('channel'):
+                        continue
+                    try:
+                        age = max(0.0, (now - datetime.fromisoformat(row['timestamp'])).total_seconds())
+                    except (TypeError, ValueError):
+                        continue
+                    channel = row['channel'].lower()
+                    scores[channel] = scores.get(channel, 0.0) + 0.5 ** (age / half_life)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            print(f"Error reading command log: {str(e)}")
+            return []
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
 
 class TimeBlocker:
     """Class to handle time-based command blocking"""
@@ -298,6 +465,432 @@ class TimeBlocker:
             return False
 
 
+_CANONICAL_DURATION_RE = re.compile(r'(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?')
+_INTERVAL_PART_RE = re.compile(r'(\d+)[\s,]*([a-zA-Z]+)')
+_INTERVAL_SUFFIX_SECONDS = {
+    suffix: seconds
+    for suffixes, seconds in (
+        (('y', 'year', 'years'), 60 * 60 * 24 * 365),
+        (('w', 'week', 'weeks'), 60 * 60 * 24 * 7),
+        (('d', 'day', 'days'), 60 * 60 * 24),
+        (('h', 'hour', 'hours'), 60 * 60),
+        (('m', 'minute', 'minutes'), 60),
+        (('s', 'second', 'seconds'), 1),
+    )
+    for suffix in suffixes
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_twitch_duration(input_str: str) -> int:
+    """Convert a Twitch duration string (e.g. '1h2m3s') to seconds"""
+    # Fast path for Helix's canonical format
+    match = _CANONICAL_DURATION_RE.fullmatch(input_str)
+    if match and input_str:
+        hours, minutes, seconds = match.groups()
+        return int(hours or 0) * 3600 + int(minutes or 0) * 60 + int(seconds or 0)
+
+    total = 0
+    for amount, suffix in _INTERVAL_PART_RE.findall(input_str):
+        multiple = _INTERVAL_SUFFIX_SECONDS.get(suffix.lower())
+        if multiple is None:
+            raise ValueError(f'Invalid interval: {input_str}')
+        total += int(amount) * multiple
+    return total
+
+
+class ContentItem:
+    """Compact playable clip/video record projected from a Helix payload"""
+
+    __slots__ = ('id', 'content_type', 'duration_seconds', 'view_count')
+    CONTENT_TYPES = ('clip', 'video', 'highlight')
+
+    def __init__(self, id: str, content_type: str, duration_seconds: float, view_count: int = 0):
+        """Initialize content item"""
+        self.id = id
+        self.content_type = content_type
+        self.duration_seconds = duration_seconds
+        self.view_count = view_count
+
+    def __repr__(self) -> str:
+        return f"ContentItem({self.content_type} {self.id}, {self.duration_seconds}s)"
+
+    @property
+    def embed_url(self) -> str:
+        """URL of the Twitch player for this item"""
+        return self.player_url()
+
+    def player_url(self, parent: str = 'twitch.tv') -> str:
+        """URL of the Twitch player for this item, embedded in a page served from parent"""
+        if self.content_type == 'clip':
+            return f"https://clips.twitch.tv/embed?clip={self.id}&parent={parent}&autoplay=true"
+        return f"https://player.twitch.tv/?video=v{self.id}&parent={parent}&autoplay=true"
+
+    @classmethod
+    def from_clip(cls, clip: Dict[str, Any]) -> 'ContentItem':
+        """Project a Helix clip payload"""
+        return cls(clip['id'], 'clip', clip['duration'], clip.get('view_count', 0))
+
+    @classmethod
+    def from_video(cls, video: Dict[str, Any], content_type: str, duration_seconds: int) -> 'ContentItem':
+        """Project a Helix video payload with its already parsed duration"""
+        return cls(video['id'], content_type, duration_seconds, video.get('view_count', 0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for API responses and queue events"""
+        return {
+            'id': self.id,
+            'content_type': self.content_type,
+            'duration_seconds': self.duration_seconds,
+            'view_count': self.view_count,
+            'embed_url': self.embed_url
+        }
+
+    def to_tuple(self) -> Tuple[str, str, float, int]:
+        """Serialize for the on-disk cache"""
+        return self.id, self.content_type, self.duration_seconds, self.view_count
+
+    @classmethod
+    def from_tuple(cls, data: Any) -> 'ContentItem':
+        """Deserialize from the on-disk cache"""
+        return cls(*data)
+
+
+def _deep_sizeof(value: Any) -> int:
+    """Estimate the memory footprint of a cached value in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_sizeof(k) + _deep_sizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(_deep_sizeof(v) for v in value)
+    elif hasattr(value, '__slots__'):
+        size += sum(_deep_sizeof(getattr(value, slot)) for slot in value.__slots__)
+    return size
+
+
+class LRUCache:
+    """Size- and byte-bounded LRU cache with per-entry expiry times"""
+
+    def __init__(self, max_entries: int, max_bytes: int = 0, sizeof: Callable[[Any], int] = _deep_sizeof):
+        """Initialize LRU cache; max_bytes of 0 disables the byte bound"""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (value, stored_at, expires_at, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Get (value, stored_at) for an unexpired key, marking it as recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[2] <= time.time():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def get(self, key: str) -> Any:
+        """Get the value for an unexpired key, or None"""
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: Any, expires_at: float, stored_at: Optional[float] = None) -> None:
+        """Store a value until expires_at, evicting entries if over capacity"""
+        if key in self._entries:
+            self._remove(key)
+        size = self._sizeof(value) if self.max_bytes else 0
+        self._entries[key] = (value, stored_at or time.time(), expires_at, size)
+        self.total_bytes += size
+        self._evict()
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """Get (key, value) pairs of unexpired entries without touching recency or counters"""
+        now = time.time()
+        return [(key, entry[0]) for key, entry in self._entries.items() if entry[2] > now]
+
+    def pop(self, key: str) -> None:
+        """Remove a key if present"""
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        self.total_bytes -= self._entries.pop(key)[3]
+
+    def _over_capacity(self) -> bool:
+        return len(self._entries) > self.max_entries or (self.max_bytes and self.total_bytes > self.max_bytes)
+
+    def _evict(self) -> None:
+        """Drop expired entries first, then least recently used ones, until within bounds"""
+        if not self._over_capacity():
+            return
+        now = time.time()
+        for key in [k for k, entry in self._entries.items() if entry[2] <= now]:
+            self._remove(key)
+            self.expirations += 1
+        while self._entries and self._over_capacity():
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self.total_bytes = sum(entry[3] for entry in self._entries.values())
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get size and hit/miss/eviction counters"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+
+class SQLiteCache:
+    """Persistent on-disk cache for Twitch API lookups, grouped by namespace"""
+
+    def __init__(self, path: str):
+        """Initialize SQLite cache"""
+        self.path = path
+        self._conn: Optional[asqlite.Connection] = None
+
+    async def open(self) -> None:
+        """Open the database and create the cache table if needed"""
+        self._conn = await asqlite.connect(self.path)
+        await self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            """
+        )
+        await self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    async def close(self) -> None:
+        """Close the database connection"""
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def load(self, namespace: str) -> Dict[str, Any]:
+        """Load every unexpired entry of a namespace as {key: (value, expires_at)}"""
+        rows = await self._conn.fetchall(
+            "SELECT key, value, expires_at FROM cache WHERE namespace = ? AND expires_at > ?",
+            (namespace, time.time())
+        )
+        return {row['key']: (json.loads(row['value']), row['expires_at']) for row in rows}
+
+    async def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        """Get unexpired entries for the given keys as {key: (value, expires_at)}"""
+        if not keys:
+            return {}
+        placeholders = ','.join('?' * len(keys))
+        rows = await self._conn.fetchall(
+            f"SELECT key, value, expires_at FROM cache WHERE namespace = ? AND expires_at > ? AND key IN ({placeholders})",
+            (namespace, time.time(), *keys)
+        )
+        return {row['key']: (json.loads(row['value']), row['expires_at']) for row in rows}
+
+    async def set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        """Store an entry with its absolute expiry time"""
+        await self._conn.execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), expires_at)
+        )
+
+    async def delete(self, namespace: str) -> None:
+        """Remove every entry of a namespace"""
+        await self._conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+
+    async def set_many(self, namespace: str, entries: Dict[str, Any], expires_at: float) -> None:
+        """Store several entries sharing the same expiry time"""
+        await self._conn.executemany(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            [(namespace, key, json.dumps(value), expires_at) for key, value in entries.items()]
+        )
+
+
+class HelixRequestError(Exception):
+    """Raised when a Helix request fails after retries"""
+
+
+class HelixRateLimiter:
+    """Tracks the Helix rate-limit bucket from response headers and paces requests"""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+    def __init__(self, config: Config):
+        """Initialize rate limiter"""
+        self.config = config
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.waits = 0
+        self.retries = 0
+
+    async def acquire(self, priority: Optional['HelixPriority']) -> None:
+        """Wait until the bucket has room; background requests leave a reserve for interactive ones"""
+        while True:
+            # Re-read the level on every pass: an interactive caller may join a waiting background flight
+            level = self.INTERACTIVE if priority is None else priority.level
+            reserve = 0 if level == self.INTERACTIVE else int(self.config.get('HELIX_BACKGROUND_RESERVE'))
+            now = time.time()
+            if self.remaining is None or now >= self.reset_at:
+                # Unknown bucket state or the bucket has refilled; the next response tells us more
+                self.remaining = None
+                return
+            if self.remaining > reserve:
+                self.remaining -= 1
+                return
+            self.waits += 1
+            if level == self.INTERACTIVE:
+                await asyncio.sleep(max(0.05, self.reset_at - now))
+            else:
+                await priority.wait_raised(max(0.05, self.reset_at - now))
+
+    def update(self, headers: Any) -> None:
+        """Update the bucket state from Ratelimit-* response headers"""
+        try:
+            if 'Ratelimit-Limit' in headers:
+                self.limit = int(headers['Ratelimit-Limit'])
+            if 'Ratelimit-Remaining' in headers:
+                self.remaining = int(headers['Ratelimit-Remaining'])
+            if 'Ratelimit-Reset' in headers:
+                self.reset_at = float(headers['Ratelimit-Reset'])
+        except ValueError:
+            pass
+
+    def backoff(self, attempt: int, status: Optional[int]) -> float:
+        """Get a jittered delay before retrying a throttled or failed request"""
+        self.retries += 1
+        if status == 429 and self.reset_at > time.time():
+            return self.reset_at - time.time() + random.uniform(0, 0.5)
+        return float(self.config.get('HELIX_RETRY_BASE_DELAY')) * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the last known bucket state and throttling counters"""
+        return {
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset_in': max(0.0, self.reset_at - time.time()),
+            'waits': self.waits,
+            'retries': self.retries
+        }
+
+
+class HelixPriority:
+    """Priority shared by the Helix requests of one task, raised when an interactive caller joins it"""
+    __slots__ = ('level', '_raised')
+
+    def __init__(self, level: int):
+        self.level = level
+        self._raised = asyncio.Event()
+
+    def raise_to(self, level: int) -> None:
+        """Raise the priority to at least level (lower levels go first), waking a waiting request"""
+        if level < self.level:
+            self.level = level
+            self._raised.set()
+
+    async def wait_raised(self, timeout: float) -> None:
+        """Sleep for up to timeout seconds, returning early if the priority is raised"""
+        try:
+            await asyncio.wait_for(self._raised.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+# Priority of Helix requests made in the current task (see TwitchAPI.background); None is interactive
+_helix_priority: contextvars.ContextVar[Optional[HelixPriority]] = contextvars.ContextVar(
+    'helix_priority', default=None
+)
+
+
+def _helix_priority_level() -> int:
+    """Get the priority level of Helix requests made in the current task"""
+    priority = _helix_priority.get()
+    return HelixRateLimiter.INTERACTIVE if priority is None else priority.level
+
+
+class ContentYieldStats:
+    """Tracks, per channel and content type, how many fetched items were kept"""
+
+    def __init__(self, config: Config):
+        """Initialize yield statistics, bounded to one entry per content type of each cacheable channel"""
+        self.config = config
+        self._stats = LRUCache(int(config.get('CONTENT_CACHE_MAX_ENTRIES')) * len(ContentItem.CONTENT_TYPES))
+
+    @staticmethod
+    def key(user_id: str, content_type: str) -> str:
+        return f"{user_id}:{content_type}"
+
+    def page_budget(self, user_id: str, content_type: str) -> int:
+        """Get how many pages are worth fetching for this type, 0 meaning skip it"""
+        max_pages = int(self.config.get('HELIX_MAX_PAGES'))
+        entry = self._stats.get(self.key(user_id, content_type))
+        if not entry or entry['probes'] < int(self.config.get('YIELD_MIN_PROBES')):
+            return max_pages
+
+        ratio = entry['kept'] / entry['fetched'] if entry['fetched'] else 0.0
+        if ratio >= float(self.config.get('YIELD_LOW_THRESHOLD')):
+            return max_pages
+        if ratio >= float(self.config.get('YIELD_SKIP_THRESHOLD')):
+            return 1
+        # Near-zero yield: skip the type, re-probing a single page once in a while
+        if time.time() - entry['last_probe'] >= float(self.config.get('YIELD_REPROBE_INTERVAL')):
+            return 1
+        return 0
+
+    def expires_at(self) -> float:
+        """Get the expiry time for an entry recorded now"""
+        return time.time() + 30 * float(self.config.get('YIELD_REPROBE_INTERVAL'))
+
+    def record(self, user_id: str, content_type: str, fetched: int, kept: int) -> Dict[str, float]:
+        """Record a fetch, decaying older observations so yields can recover"""
+        decay = float(self.config.get('YIELD_DECAY'))
+        key = self.key(user_id, content_type)
+        entry = self._stats.get(key) or {'fetched': 0.0, 'kept': 0.0, 'probes': 0, 'last_probe': 0.0}
+        entry['fetched'] = entry['fetched'] * decay + fetched
+        entry['kept'] = entry['kept'] * decay + kept
+        entry['probes'] += 1
+        entry['last_probe'] = time.time()
+        self._stats.set(key, entry, self.expires_at())
+        return entry
+
+    def load(self, entries: Dict[str, Tuple[Dict[str, float], float]]) -> None:
+        """Load previously persisted (statistics, expires_at) entries"""
+        for key, (entry, expires_at) in entries.items():
+            self._stats.set(key, entry, expires_at)
+
+    def clear(self) -> None:
+        """Forget every tracked entry"""
+        self._stats.clear()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get a copy of every tracked entry"""
+        return {key: dict(entry) for key, entry in self._stats.items()}
+
+
 class TwitchAPI:
     """Class to interact with Twitch API"""
 
@@ -305,228 +898,796 @@ class TwitchAPI:
         """Initialize Twitch API client"""
         self.config = config
         self.token_manager = token_manager
-        self._channel_cache = {}  # Cache for channel IDs
-        self._content_cache = {}  # Cache for channel content
-        self._cache_expiry = {}   # Expiry times for cache entries
-        self.cache_duration = 300  # Cache duration in seconds (5 minutes)
+        self._channel_cache = LRUCache(int(config.get('CHANNEL_ID_CACHE_MAX_ENTRIES')))  # Cache for channel IDs
+        self._channel_created = LRUCache(int(config.get('CHANNEL_ID_CACHE_MAX_ENTRIES')))  # Account creation time by channel ID
+        self._content_cache = LRUCache(  # Cache for channel content
+            int(config.get('CONTENT_CACHE_MAX_ENTRIES')),
+            int(config.get('CONTENT_CACHE_MAX_BYTES'))
+        )
+        self._inflight: Dict[str, Tuple[asyncio.Task, HelixPriority]] = {}  # Single-flight fetches by cache key
+
+        # Short-lived negative entries, kept apart from the positive caches
+        negative_max_entries = int(config.get('NEGATIVE_CACHE_MAX_ENTRIES'))
+        self._missing_channels = LRUCache(negative_max_entries)  # Logins Helix does not know
+        self._empty_content = LRUCache(negative_max_entries)  # Channels without eligible content
+        config.add_listener(self._on_config_changed)
+        self._background_tasks = set()
+
+        # Channel names waiting to be resolved in the next batched /users request
+        self._pending_logins: Dict[str, asyncio.Future] = {}
+        self._login_batch_task: Optional[asyncio.Task] = None
+        self._login_batch_priority: Optional[HelixPriority] = None
+        self._resolving_logins: Dict[str, Tuple[asyncio.Future, HelixPriority]] = {}  # Batches sent to Helix
+
+        # Background event loop that owns the pooled HTTP session
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._helix_semaphore: Optional[asyncio.Semaphore] = None
+
+        # Optional persistent cache backend (CACHE_BACKEND: sqlite)
+        self._store: Optional[SQLiteCache] = None
+        self._yield_stats = ContentYieldStats(config)
+        self._rate_limiter = HelixRateLimiter(config)
+        self.stats = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0,
+            'coalesced': 0
+        }
 
-    async def get_channel_id(self, channel_name: str) -> Optional[str]:
-        """Get channel ID from channel name, using cache if available"""
-        current_time = time.time()
-        if channel_name in self._channel_cache and self._cache_expiry.get(f"channel_{channel_name}", 0) > current_time:
-            return self._channel_cache[channel_name]
+    def start(self) -> None:
+        """Start the background event loop and open the pooled session"""
+        if self.loop is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._loop_thread.start()
+        self.run(self._open_session())
+
+    def close(self) -> None:
+        """Close the pooled session and stop the background event loop"""
+        if self.loop is None:
+            return
+        try:
+            self.run(self._close_session(), timeout=10)
+        except Exception as e:
+            print(f"Error closing Twitch API session: {str(e)}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join(timeout=5)
+        self.loop = None
+        self._loop_thread = None
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule a coroutine on the background event loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the background event loop and wait for its result"""
+        return self.submit(coro).result(timeout)
+
+    async def _open_session(self) -> None:
+        """Create the shared keep-alive session used by all Helix calls"""
+        self._helix_semaphore = asyncio.Semaphore(int(self.config.get('HELIX_CONCURRENCY')))
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._count_trace('requests'))
+        trace_config.on_connection_create_end.append(self._count_trace('connections_created'))
+        trace_config.on_connection_reuseconn.append(self._count_trace('connections_reused'))
+        trace_config.on_dns_cache_hit.append(self._count_trace('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(self._count_trace('dns_cache_misses'))
+
+        connector = aiohttp.TCPConnector(
+            limit=int(self.config.get('HELIX_POOL_LIMIT')),
+            limit_per_host=int(self.config.get('HELIX_POOL_LIMIT_PER_HOST')),
+            ttl_dns_cache=int(self.config.get('HELIX_DNS_CACHE_TTL')),
+            keepalive_timeout=float(self.config.get('HELIX_KEEPALIVE_TIMEOUT'))
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=float(self.config.get('HELIX_REQUEST_TIMEOUT'))),
+            trace_configs=[trace_config]
+        )
 
-        access_token = await self.token_manager.get_app_access_token()
-        if not access_token:
-            print(self.config.get_message('errors.app_access_token_error', api_call='get_channel_id'))
-            return None
-        headers = {
-            'Client-ID': self.config.get('TWITCH_CLIENT_ID'),
-            'Authorization': f'Bearer {access_token}'
-        }
+        if self.config.get('CACHE_BACKEND') == 'sqlite':
+            await self._open_store()
 
+    async def _close_session(self) -> None:
+        """Close the shared session and release pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._store is not None:
+            await self._store.close()
+            self._store = None
+
+    async def _open_store(self) -> None:
+        """Open the on-disk cache and warm the in-memory caches from it"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f'https://api.twitch.tv/helix/users?login={channel_name}',
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        data_list = data.get('data', [])
-                        if data_list:
-                            channel_id = data_list[0]['id']
-                            self._channel_cache[channel_name] = channel_id
-                            self._cache_expiry[f"channel_{channel_name}"] = current_time + self.cache_duration
-                            return channel_id
-                    else:
-                        print(f"Error getting channel ID: {response.status} - {await response.text()}")
+            self._store = SQLiteCache(self.config.get('CACHE_DB_PATH'))
+            await self._store.open()
+            channels = await self._store.load('channel')
+            for login, (channel_id, expires_at) in channels.items():
+                self._channel_cache.set(login, channel_id, expires_at)
+            for user_id, (created_at, expires_at) in (await self._store.load('created')).items():
+                self._channel_created.set(user_id, created_at, expires_at)
+            await self._check_content_config()
+            contents = await self._store.load('content')
+            for user_id, (rows, expires_at) in contents.items():
+                content = self._decode_content(rows)
+                if content is None:
+                    continue
+                self._content_cache.set(user_id, content, expires_at, expires_at - self._content_ttls()[1])
+            self._yield_stats.load(await self._store.load('yield'))
+            print(f"Loaded {len(channels)} channel IDs and {len(contents)} content lists from {self._store.path}")
+        except Exception as e:
+            print(f"Error opening cache database: {str(e)}")
+            self._store = None
+
+    def _content_config(self) -> str:
+        """Get a fingerprint of the settings that content answers depend on"""
+        return json.dumps({key: str(self.config.get(key)) for key in sorted(CONTENT_CONFIG_KEYS)})
+
+    async def _check_content_config(self) -> None:
+        """Drop stored content and yield rows computed with settings edited since the last run"""
+        stored = await self._store.get_many('meta', ['content_config'])
+        content_config = self._content_config()
+        if 'content_config' in stored and stored['content_config'][0] == content_config:
+            return
+        await self._store.delete('content')
+        await self._store.delete('yield')
+        await self._store.set('meta', 'content_config', content_config, float('inf'))
+
+    @staticmethod
+    def _decode_content(rows: List[Any]) -> Optional[List[ContentItem]]:
+        """Rebuild content items from the on-disk cache, or None if the rows are unreadable"""
+        try:
+            return [ContentItem.from_tuple(row) for row in rows]
+        except (TypeError, ValueError):
             return None
+
+    async def _store_set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        """Write an entry to the on-disk cache if it is enabled"""
+        if self._store is None:
+            return
+        try:
+            await self._store.set(namespace, key, value, expires_at)
         except Exception as e:
-            print(f"Error getting channel ID: {str(e)}")
+            print(f"Error writing cache database: {str(e)}")
+
+    def _count_trace(self, key: str):
+        """Build an aiohttp trace callback that increments a stats counter"""
+        async def callback(session, trace_config_ctx, params):
+            self.stats[key] += 1
+        return callback
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection, request and cache statistics"""
+        stats = dict(self.stats)
+        stats['channel_cache'] = self._channel_cache.get_stats()
+        stats['content_cache'] = self._content_cache.get_stats()
+        stats['missing_channels'] = self._missing_channels.get_stats()
+        stats['empty_content'] = self._empty_content.get_stats()
+        stats['rate_limit'] = self._rate_limiter.get_stats()
+        return stats
+
+    def _on_config_changed(self, changed_keys: List[str]) -> None:
+        """Drop cached content answers that depend on changed settings"""
+        if not CONTENT_CONFIG_KEYS.intersection(changed_keys):
+            return
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._spawn, self._invalidate_content())
+        else:
+            self._empty_content.clear()
+            self._content_cache.clear()
+
+    async def _invalidate_content(self) -> None:
+        """Clear content caches and yield statistics computed with the old settings"""
+        self._empty_content.clear()
+        self._content_cache.clear()
+        self._yield_stats.clear()
+        if self._store is not None:
+            try:
+                await self._store.delete('content')
+                await self._store.delete('yield')
+                await self._store.set('meta', 'content_config', self._content_config(), float('inf'))
+            except Exception as e:
+                print(f"Error clearing cache database: {str(e)}")
+
+    async def get_yield_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get per-channel content type yield statistics; run on the API loop, which owns them"""
+        return self._yield_stats.get_stats()
+
+    async def _helix_get(self, endpoint: str, params: Any, api_call: str) -> Optional[Dict[str, Any]]:
+        """Perform a GET request against a Helix endpoint using the pooled session"""
+        max_retries = int(self.config.get('HELIX_MAX_RETRIES'))
+        token_retried = False
+        attempt = 0
+        while True:
+            access_token = await self.token_manager.get_app_access_token(self._session)
+            if not access_token:
+                print(self.config.get_message('errors.app_access_token_error', api_call=api_call))
+                return None
+            headers = {
+                'Client-ID': self.config.get('TWITCH_CLIENT_ID'),
+                'Authorization': f'Bearer {access_token}'
+            }
+
+            status = None
+            await self._rate_limiter.acquire(_helix_priority.get())
+            try:
+                async with self._helix_semaphore:
+                    async with self._session.get(f'{HELIX_BASE_URL}/{endpoint}', headers=headers, params=params) as response:
+                        self._rate_limiter.update(response.headers)
+                        status = response.status
+                        if status == 200:
+                            return await response.json()
+                        if status == 401 and not token_retried:
+                            # Token was revoked or expired early: drop it and retry once with a fresh one
+                            self.token_manager.invalidate_app_access_token()
+                            token_retried = True
+                            continue
+                        if status != 429 and status < 500:
+                            print(f"Error in {api_call}: {status} - {await response.text()}")
+                            return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Error in {api_call}: {str(e)}")
+
+            # Throttled, server error or network failure: back off with jitter and retry
+            if attempt >= max_retries:
+                print(f"Error in {api_call}: giving up after {attempt + 1} attempts (last status {status})")
+                return None
+            await asyncio.sleep(self._rate_limiter.backoff(attempt, status))
+            attempt += 1
+
+    async def background(self, coro) -> Any:
+        """Run a coroutine whose Helix requests yield to interactive !so lookups"""
+        token = _helix_priority.set(HelixPriority(HelixRateLimiter.BACKGROUND))
+        try:
+            return await coro
+        finally:
+            _helix_priority.reset(token)
+
+    def _spawn_shared(self, coro, level: int) -> Tuple[asyncio.Task, HelixPriority]:
+        """Start a task shared by several callers, with its own priority that any caller can raise"""
+        priority = HelixPriority(level)
+        token = _helix_priority.set(priority)
+        try:
+            # The task copies the current context, so its requests read this priority
+            return self._spawn(coro), priority
+        finally:
+            _helix_priority.reset(token)
+
+    async def get_channel_id(self, channel_name: str) -> Optional[str]:
+        """Get channel ID from channel name, batching concurrent cache misses into one request"""
+        login = channel_name.lower()
+        channel_id = self._channel_cache.get(login)
+        if channel_id is not None:
+            return channel_id
+        if self._missing_channels.get(login):
             return None
+        return await asyncio.shield(self._queue_login(login))
+
+    def _queue_login(self, login: str) -> asyncio.Future:
+        """Get the pending lookup for a login, adding it to the next batch if none is pending"""
+        level = _helix_priority_level()
+        resolving = self._resolving_logins.get(login)
+        if resolving is not None:
+            self.stats['coalesced'] += 1
+            future, priority = resolving
+            priority.raise_to(level)
+            return future
+
+        future = self._pending_logins.get(login)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            self._login_batch_priority.raise_to(level)
+            return future
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_logins[login] = future
+        if self._login_batch_task is None:
+            self._login_batch_task, self._login_batch_priority = self._spawn_shared(self._flush_login_batch(), level)
+        else:
+            self._login_batch_priority.raise_to(level)
+        return future
+
+    async def _flush_login_batch(self) -> None:
+        """Resolve every channel name queued during the batch window"""
+        await asyncio.sleep(float(self.config.get('HELIX_BATCH_WINDOW')))
+        pending, self._pending_logins = self._pending_logins, {}
+        self._login_batch_task = None
+        # Keep the batch joinable, and its priority raisable, while Helix answers
+        for login, future in pending.items():
+            self._resolving_logins[login] = (future, self._login_batch_priority)
 
-    async def get_channel_clips(self, user_id: str) -> List[Dict[str, Any]]:
+        try:
+            channel_ids = await self._resolve_channel_ids(list(pending))
+        finally:
+            for login in pending:
+                self._resolving_logins.pop(login, None)
+        for login, future in pending.items():
+            if not future.done():
+                future.set_result(channel_ids.get(login))
+
+    async def get_channel_ids(self, channel_names: List[str]) -> Dict[str, Optional[str]]:
+        """Get channel IDs for many channel names using batched Helix /users requests"""
+        channel_ids = {}
+        missing = []
+        for channel_name in channel_names:
+            login = channel_name.lower()
+            channel_id = self._channel_cache.get(login)
+            if channel_id is not None:
+                channel_ids[login] = channel_id
+            elif self._missing_channels.get(login):
+                channel_ids[login] = None
+            elif login not in missing:
+                missing.append(login)
+
+        if missing:
+            # Share the batch queue with get_channel_id so overlapping lookups are made once
+            resolved = await asyncio.gather(*[asyncio.shield(self._queue_login(login)) for login in missing])
+            channel_ids.update(zip(missing, resolved))
+        return channel_ids
+
+    async def _resolve_channel_ids(self, missing: List[str]) -> Dict[str, Optional[str]]:
+        """Resolve lowercase logins missing from the memory cache"""
+        expires_at = time.time() + int(self.config.get('CHANNEL_ID_CACHE_TTL'))
+        channel_ids = {}
+
+        # Fall back to the on-disk cache before asking Helix
+        if missing and self._store is not None:
+            try:
+                stored = await self._store.get_many('channel', missing)
+            except Exception as e:
+                print(f"Error reading cache database: {str(e)}")
+                stored = {}
+            for login, (channel_id, stored_expires_at) in stored.items():
+                self._channel_cache.set(login, channel_id, stored_expires_at)
+                channel_ids[login] = channel_id
+            missing = [login for login in missing if login not in stored]
+
+        # Helix accepts up to 100 login parameters per /users request
+        for i in range(0, len(missing), HELIX_USERS_BATCH_SIZE):
+            batch = missing[i:i + HELIX_USERS_BATCH_SIZE]
+            try:
+                data = await self._helix_get('users', [('login', login) for login in batch], 'get_channel_ids')
+                resolved = {}
+                created = {}
+                for user in (data or {}).get('data', []):
+                    login = user['login'].lower()
+                    self._channel_cache.set(login, user['id'], expires_at)
+                    resolved[login] = user['id']
+                    created_at = self._parse_rfc3339(user.get('created_at'))
+                    if created_at is not None:
+                        self._channel_created.set(user['id'], created_at, expires_at)
+                        created[user['id']] = created_at
+                channel_ids.update(resolved)
+                if data is not None:
+                    # Helix answered but did not know these logins (typo, banned account)
+                    negative_expires_at = time.time() + int(self.config.get('NEGATIVE_CACHE_TTL'))
+                    for login in batch:
+                        if login not in resolved:
+                            self._missing_channels.set(login, True, negative_expires_at)
+                if resolved and self._store is not None:
+                    await self._store.set_many('channel', resolved, expires_at)
+                    await self._store.set_many('created', created, expires_at)
+            except Exception as e:
+                print(f"Error getting channel IDs: {str(e)}")
+            for login in batch:
+                channel_ids.setdefault(login, None)
+        return channel_ids
+
+    @staticmethod
+    def _parse_rfc3339(value: Optional[str]) -> Optional[float]:
+        """Parse a Helix timestamp such as 2016-12-14T20:32:28Z into epoch seconds"""
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+
+    async def _helix_pages(self, endpoint: str, params: Dict[str, Any], api_call: str,
+                           max_pages: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield pages of a paginated Helix endpoint as they arrive, within the page and time budget"""
+        if max_pages is None:
+            max_pages = int(self.config.get('HELIX_MAX_PAGES'))
+        deadline = time.monotonic() + float(self.config.get('HELIX_PAGE_TIME_BUDGET'))
+        params = dict(params)
+        for _ in range(max_pages):
+            data = await self._helix_get(endpoint, params, api_call)
+            if data is None:
+                raise HelixRequestError(f"{api_call} failed")
+            yield data.get('data', [])
+            cursor = data.get('pagination', {}).get('cursor')
+            if not cursor or time.monotonic() >= deadline:
+                return
+            params['after'] = cursor
+
+    async def get_channel_clips(self, user_id: str, max_pages: Optional[int] = None) -> List[ContentItem]:
         """Get clips for a channel"""
-        access_token = await self.token_manager.get_app_access_token()
-        if not access_token:
-            print(self.config.get_message('errors.app_access_token_error', api_call='get_channel_clips'))
-            return []
-        headers = {
-            'Client-ID': self.config.get('TWITCH_CLIENT_ID'),
-            'Authorization': f'Bearer {access_token}'
-        }
+        if self.config.get('CLIP_FETCH_MODE') == 'sharded':
+            return await self._get_sharded_clips(user_id, max_pages)
 
         clips = []
-        cursor = None
+        fetched = 0
         max_video_time = int(self.config.get('MAX_VIDEO_TIME'))
 
         try:
-            async with aiohttp.ClientSession() as session:
-                while True:
-                    params = {
-                        'broadcaster_id': user_id,
-                        'first': 100,
-                    }
-                    if cursor:
-                        params['after'] = cursor
-
-                    async with session.get(
-                        'https://api.twitch.tv/helix/clips',
-                        headers=headers,
-                        params=params
-                    ) as response:
-                        if response.status != 200:
-                            print(f"Error getting clips: {response.status} - {await response.text()}")
-                            break
-                        data = await response.json()
-                        new_clips = [c for c in data.get('data', []) if c['duration'] <= max_video_time]
-                        clips.extend(new_clips)
-                        cursor = data.get('pagination', {}).get('cursor')
-                        if not cursor or len(clips) >= 100: # Avoid excessive pagination if already have 100 clips within time limit
-                            break
+            params = {'broadcaster_id': user_id, 'first': 100}
+            async for page in self._helix_pages('clips', params, 'get_channel_clips', max_pages):
+                fetched += len(page)
+                clips.extend(ContentItem.from_clip(c) for c in page if c['duration'] <= max_video_time)
+                if len(clips) >= 100: # Avoid excessive pagination if already have 100 clips within time limit
+                    break
+            await self._record_yield(user_id, 'clip', fetched, len(clips))
+            return clips
+        except HelixRequestError:
+            # Keep what earlier pages returned; with nothing to show, let the caller see the failure
+            if not clips:
+                raise
             return clips
         except Exception as e:
             print(f"Error getting clips: {str(e)}")
             return []
 
-    async def get_channel_videos(self, user_id: str, video_type: str) -> List[Dict[str, Any]]:
-        """Get videos for a channel"""
-        access_token = await self.token_manager.get_app_access_token()
-        if not access_token:
-            print(self.config.get_message('errors.app_access_token_error', api_call='get_channel_videos'))
-            return []
-        headers = {
-            'Client-ID': self.config.get('TWITCH_CLIENT_ID'),
-            'Authorization': f'Bearer {access_token}'
-        }
+    async def _get_sharded_clips(self, user_id: str, max_pages: Optional[int] = None) -> List[ContentItem]:
+        """Get clips by fetching time-window shards of the channel's history concurrently"""
+        shards = max(1, int(self.config.get('CLIP_SHARDS')))
+        if max_pages is not None:
+            shards = max(1, min(shards, max_pages))  # One request per shard, within the page budget
+        max_video_time = int(self.config.get('MAX_VIDEO_TIME'))
+        # Split the channel's own history; clips cannot predate the account or the clips feature
+        history_start = max(CLIPS_EPOCH, self._channel_created.get(user_id) or CLIPS_EPOCH)
+        width = (time.time() - history_start) / shards
+
+        def rfc3339(timestamp: float) -> str:
+            return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        # A cursor chain is sequential, but independent started_at/ended_at windows are not
+        requests_params = [{
+            'broadcaster_id': user_id,
+            'first': 100,
+            'started_at': rfc3339(history_start + i * width),
+            'ended_at': rfc3339(history_start + (i + 1) * width)
+        } for i in range(shards)]
+        pages = await asyncio.gather(
+            *[self._helix_get('clips', params, 'get_channel_clips') for params in requests_params],
+            return_exceptions=True
+        )
 
-        videos = []
-        cursor = None
+        if all(page is None or isinstance(page, Exception) for page in pages):
+            raise HelixRequestError("get_channel_clips failed for every shard")
+
+        clips = {}
+        fetched = 0
+        for page in pages:
+            if isinstance(page, Exception):
+                print(f"Error getting clips: {str(page)}")
+                continue
+            data = (page or {}).get('data', [])
+            fetched += len(data)
+            for c in data:
+                if c['duration'] <= max_video_time and c['id'] not in clips:
+                    clips[c['id']] = ContentItem.from_clip(c)
+        await self._record_yield(user_id, 'clip', fetched, len(clips))
+        return list(clips.values())
+
+    async def get_channel_videos(self, user_id: str, video_type: str, max_pages: Optional[int] = None) -> List[ContentItem]:
+        """Get a uniform random sample of short enough videos ('archive' videos become type 'video')"""
+        content_type = 'video' if video_type == 'archive' else video_type
         max_video_time = int(self.config.get('MAX_VIDEO_TIME'))
+        sample_size = int(self.config.get('VIDEO_SAMPLE_SIZE'))
+        sample = []
+        fetched = 0
+        eligible = 0
 
         try:
-            async with aiohttp.ClientSession() as session:
-                while True:
-                    params = {
-                        'user_id': user_id,
-                        'first': 100, # Max allowed by Twitch API is 100
-                        'type': video_type
-                    }
-                    if cursor:
-                        params['after'] = cursor
-
-                    async with session.get(
-                        'https://api.twitch.tv/helix/videos',
-                        headers=headers,
-                        params=params
-                    ) as response:
-                        if response.status != 200:
-                            print(f"Error getting videos: {response.status} - {await response.text()}")
-                            break
-                        data = await response.json()
-                        videos.extend(data.get('data', []))
-                        cursor = data.get('pagination', {}).get('cursor')
-                        if not cursor: # No more pages
-                            break
-
-            filtered = []
-            for v in videos:
-                try:
-                    duration = self._interval_string_to_seconds(v['duration'])
-                    if duration <= max_video_time:
-                        filtered.append(v)
-                except Exception as e:
-                    print(f"Error processing video duration: {str(e)} for video {v.get('id')}")
-                    continue
-            return filtered
+            params = {
+                'user_id': user_id,
+                'first': 100, # Max allowed by Twitch API is 100
+                'type': video_type
+            }
+            async for page in self._helix_pages('videos', params, 'get_channel_videos', max_pages):
+                fetched += len(page)
+                for v in page:
+                    try:
+                        duration = self._interval_string_to_seconds(v['duration'])
+                    except Exception as e:
+                        print(f"Error processing video duration: {str(e)} for video {v.get('id')}")
+                        continue
+                    if duration > max_video_time:
+                        continue
+
+                    # Reservoir sampling keeps every eligible video equally likely without storing them all
+                    eligible += 1
+                    if len(sample) < sample_size:
+                        sample.append(ContentItem.from_video(v, content_type, duration))
+                    else:
+                        index = random.randrange(eligible)
+                        if index < sample_size:
+                            sample[index] = ContentItem.from_video(v, content_type, duration)
+            await self._record_yield(user_id, content_type, fetched, eligible)
+            return sample
+        except HelixRequestError:
+            if not sample:
+                raise
+            return sample
         except Exception as e:
             print(f"Error getting videos: {str(e)}")
             return []
 
-    async def get_channel_content(self, user_id: str) -> List[Dict[str, Any]]:
+    async def get_channel_content(self, user_id: str) -> List[ContentItem]:
         """Get all content (clips, videos, highlights) for a channel"""
-        current_time = time.time()
-        if user_id in self._content_cache and self._cache_expiry.get(f"content_{user_id}", 0) > current_time:
-            return self._content_cache[user_id]
+        if self._empty_content.get(user_id):
+            return []
 
-        content = []
-        content_types = self.config.get('CONTENT_TYPES', [])
+        entry = self._content_cache.get_entry(user_id)
+        if entry is not None:
+            content, fetched_at = entry
+            # Past the soft TTL: serve the stale list now and refresh it in the background
+            if time.time() - fetched_at >= self._content_ttls()[0]:
+                self._schedule_content_refresh(user_id)
+            return content
+
+        # Concurrent misses for the same channel share one load
+        return await asyncio.shield(self._coalesce(f"content:{user_id}", lambda: self._load_channel_content(user_id)))
+
+    async def _load_channel_content(self, user_id: str) -> List[ContentItem]:
+        """Load a channel's content from the on-disk cache, or from Helix"""
+        if self._store is not None:
+            try:
+                stored = await self._store.get_many('content', [user_id])
+            except Exception as e:
+                print(f"Error reading cache database: {str(e)}")
+                stored = {}
+            content = self._decode_content(stored[user_id][0]) if user_id in stored else None
+            if content is not None:
+                expires_at = stored[user_id][1]
+                self._content_cache.set(user_id, content, expires_at, expires_at - self._content_ttls()[1])
+                return content
+
+        return await self._fetch_channel_content(user_id)
+
+    def _content_ttls(self):
+        """Get the (soft, hard) TTLs for content cache entries"""
+        soft_ttl = int(self.config.get('CONTENT_CACHE_SOFT_TTL'))
+        if not self.config.get('CONTENT_CACHE_SERVE_STALE'):
+            return soft_ttl, soft_ttl
+        return soft_ttl, max(soft_ttl, int(self.config.get('CONTENT_CACHE_HARD_TTL')))
+
+    def _schedule_content_refresh(self, user_id: str) -> None:
+        """Refresh a channel's content in the background unless a fetch is already running"""
+        key = f"content:{user_id}"
+        if key not in self._inflight:
+            self._coalesce(key, lambda: self._fetch_channel_content(user_id), HelixRateLimiter.BACKGROUND)
+
+    def _coalesce(self, key: str, coro_factory: Callable[[], Awaitable[Any]],
+                  level: Optional[int] = None) -> asyncio.Task:
+        """Get the in-flight task for a key, starting one at the caller's priority (or level) if none is running"""
+        if level is None:
+            level = _helix_priority_level()
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.stats['coalesced'] += 1
+            task, priority = flight
+            priority.raise_to(level)  # An interactive caller must not wait behind the background reserve
+            return task
+        task, priority = self._spawn_shared(coro_factory(), level)
+        self._inflight[key] = (task, priority)
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Start a background task on the running loop, keeping a reference until it finishes"""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _fetch_channel_content(self, user_id: str) -> List[ContentItem]:
+        """Fetch a channel's content from Helix and update the cache"""
+        current_time = time.time()
+        enabled_types = self.config.get('CONTENT_TYPES', [])
+        content_types = [t for t in ContentItem.CONTENT_TYPES if t in enabled_types]
         max_video_time = int(self.config.get('MAX_VIDEO_TIME'))
 
-        # Get clips
-        if 'clip' in content_types:
-            clips_data = await self.get_channel_clips(user_id)
-            for clip in clips_data:
-                clip.update({
-                    'content_type': 'clip',
-                    'embed_url': f"https://clips.twitch.tv/embed?clip={clip['id']}&parent=twitch.tv&autoplay=true",
-                    'duration_seconds': clip['duration']
-                })
-            content.extend(clips_data)
-
-        # Get videos
-        if 'video' in content_types:
-            videos_data = await self.get_channel_videos(user_id, 'archive')
-            for video in videos_data:
-                video_id = video['url'].split('/')[-1]
-                video.update({
-                    'content_type': 'video',
-                    'embed_url': f"https://player.twitch.tv/?video=v{video_id}&parent=twitch.tv&autoplay=true",
-                    'duration_seconds': self._interval_string_to_seconds(video['duration'])
-                })
-            content.extend(videos_data)
-
-        # Get highlights
-        if 'highlight' in content_types:
-            highlights_data = await self.get_channel_videos(user_id, 'highlight')
-            for highlight in highlights_data:
-                video_id = highlight['url'].split('/')[-1]
-                highlight.update({
-                    'content_type': 'highlight',
-                    'embed_url': f"https://player.twitch.tv/?video=v{video_id}&parent=twitch.tv&autoplay=true",
-                    'duration_seconds': self._interval_string_to_seconds(highlight['duration'])
-                })
-            content.extend(highlights_data)
+        # Fetch every enabled content type concurrently; one type failing keeps the others
+        results = await asyncio.gather(
+            *[self._get_content_of_type(user_id, content_type) for content_type in content_types],
+            return_exceptions=True
+        )
+        content = []
+        failed = False
+        for content_type, result in zip(content_types, results):
+            if isinstance(result, Exception):
+                print(f"Error getting {content_type} content: {str(result)}")
+                failed = True
+                continue
+            content.extend(result)
 
         # Filter by duration and update cache
-        # Ensure duration_seconds is present and is a number before filtering
-        filtered_content = [c for c in content if isinstance(c.get('duration_seconds'), (int, float)) and c['duration_seconds'] <= max_video_time]
+        filtered_content = [c for c in content if c.duration_seconds <= max_video_time]
+
+        if not filtered_content:
+            # Remember "no eligible content" briefly, but never cache a failed fetch
+            if not failed:
+                self._content_cache.pop(user_id)
+                self._empty_content.set(user_id, True, current_time + int(self.config.get('NEGATIVE_CACHE_TTL')))
+            return filtered_content
 
-        self._content_cache[user_id] = filtered_content
-        self._cache_expiry[f"content_{user_id}"] = current_time + self.cache_duration
+        expires_at = current_time + self._content_ttls()[1]
+        self._content_cache.set(user_id, filtered_content, expires_at, current_time)
+        await self._store_set('content', user_id, [c.to_tuple() for c in filtered_content], expires_at)
 
         return filtered_content
 
+    async def _get_content_of_type(self, user_id: str, content_type: str) -> List[ContentItem]:
+        """Get playable content of a single type for a channel, within its yield-based page budget"""
+        max_pages = self._yield_stats.page_budget(user_id, content_type)
+        if max_pages == 0:
+            return []
+        if content_type == 'clip':
+            return await self.get_channel_clips(user_id, max_pages)
+        # Videos are Helix 'archive' videos; highlights share the same endpoint
+        return await self.get_channel_videos(user_id, 'archive' if content_type == 'video' else content_type, max_pages)
+
+    async def _record_yield(self, user_id: str, content_type: str, fetched: int, kept: int) -> None:
+        """Record how many fetched items were kept and persist it next to the cache"""
+        entry = self._yield_stats.record(user_id, content_type, fetched, kept)
+        await self._store_set(
+            'yield', ContentYieldStats.key(user_id, content_type), entry, self._yield_stats.expires_at()
+        )
+
     @staticmethod
     def _interval_string_to_seconds(input_str: str) -> int:
         """Convert Twitch duration string to seconds"""
-        suffix_map = {
-            'y': 'y', 'year': 'y', 'years': 'y',
-            'w': 'w', 'week': 'w', 'weeks': 'w',
-            'd': 'd', 'day': 'd', 'days': 'd',
-            'h': 'h', 'hour': 'h', 'hours': 'h',
-            'm': 'm', 'minute': 'm', 'minutes': 'm',
-            's': 's', 'second': 's', 'seconds': 's',
-        }
-        suffix_multiples = {
-            'y': 60 * 60 * 24 * 365,
-            'w': 60 * 60 * 24 * 7,
-            'd': 60 * 60 * 24,
-            'h': 60 * 60,
-            'm': 60,
-            's': 1,
+        return _parse_twitch_duration(input_str)
+
+
+class CacheWarmer:
+    """Class to prefetch the most shouted-out channels from the command log"""
+
+    def __init__(self, config: Config, twitch_api: TwitchAPI, command_logger: CommandLogger):
+        """Initialize cache warmer"""
+        self.config = config
+        self.twitch_api = twitch_api
+        self.command_logger = command_logger
+        self.last_warmup: Optional[Dict[str, Any]] = None
+        self.known_channels = set()  # Every channel found in the command log on the last run
+
+    async def run(self) -> None:
+        """Warm the caches now and then every WARMUP_INTERVAL seconds"""
+        while True:
+            if self.config.get('WARMUP_ENABLED'):
+                try:
+                    await self.twitch_api.background(self.warm())
+                except Exception as e:
+                    print(f"Error warming cache: {str(e)}")
+            interval = float(self.config.get('WARMUP_INTERVAL'))
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+    async def warm(self) -> Dict[str, Any]:
+        """Prefetch IDs and content of the top ranked channels within the Helix request budget"""
+        started_at = time.time()
+        first_request = self.twitch_api.stats['requests']
+        budget = int(self.config.get('WARMUP_MAX_REQUESTS'))
+
+        ranked = await asyncio.get_running_loop().run_in_executor(
+            None, self.command_logger.rank_channels, 'so', float(self.config.get('WARMUP_HALF_LIFE'))
+        )
+        self.known_channels = {channel for channel, _ in ranked}
+        channels = [channel for channel, _ in ranked[:int(self.config.get('WARMUP_TOP_N'))]]
+
+        warmed, skipped = [], []
+        channel_ids = await self.twitch_api.get_channel_ids(channels) if channels and budget > 0 else {}
+        content_requests = 0
+        for channel in channels:
+            user_id = channel_ids.get(channel)
+            used = self.twitch_api.stats['requests'] - first_request
+            # Stop before a channel whose expected cost would exceed the budget
+            expected = content_requests / len(warmed) if warmed else 0
+            if not user_id or used + expected > budget or used >= budget:
+                skipped.append(channel)
+                continue
+            try:
+                await self.twitch_api.get_channel_content(user_id)
+                warmed.append(channel)
+                content_requests += self.twitch_api.stats['requests'] - first_request - used
+            except Exception as e:
+                print(f"Error warming cache for {channel}: {str(e)}")
+                skipped.append(channel)
+
+        self.last_warmup = {
+            'started_at': started_at,
+            'duration': round(time.time() - started_at, 3),
+            'requests': self.twitch_api.stats['requests'] - first_request,
+            'warmed': warmed,
+            'skipped': skipped
         }
-        total = 0
-        pattern = re.compile(r'(\d+)[\s,]*([a-zA-Z]+)')
-        for match in pattern.finditer(input_str):
-            amount = int(match.group(1))
-            suffix = match.group(2).lower()
-            if suffix not in suffix_map:
-                raise ValueError(f'Invalid interval: {input_str}')
-            index = suffix_map[suffix]
-            total += amount * suffix_multiples[index]
-        return total
+        print(f"🔥 Cache warm-up: {len(warmed)} channel(s) warmed, {len(skipped)} skipped, "
+              f"{self.last_warmup['requests']} Helix request(s) in {self.last_warmup['duration']:.1f}s")
+        return self.last_warmup
+
+
+class SpeculativePrefetcher:
+    """Class to prefetch content for chatters who are likely shoutout targets"""
+
+    def __init__(self, config: Config, twitch_api: TwitchAPI, cache_warmer: Optional[CacheWarmer] = None):
+        """Initialize speculative prefetcher"""
+        self.config = config
+        self.twitch_api = twitch_api
+        self.cache_warmer = cache_warmer
+        self._recent = LRUCache(int(config.get('NEGATIVE_CACHE_MAX_ENTRIES')))  # Chatters prefetched within the TTL
+        self._history = deque()  # (finished_at, helix_requests) of prefetches in the last hour
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats = {'prefetched': 0, 'over_budget': 0}
+
+    def observe_chatter(self, login: str) -> None:
+        """Consider a chatter for prefetching if they are allow-listed or a known shoutout target"""
+        if not self.config.get('SPECULATIVE_PREFETCH'):
+            return
+        login = login.lower()
+        allowlist = {user.lower() for user in self.config.get('PREFETCH_ALLOWLIST', [])}
+        known = self.cache_warmer.known_channels if self.cache_warmer and self.config.get('PREFETCH_KNOWN_TARGETS') else ()
+        if login in allowlist or login in known:
+            self._submit(login, 'chatter')
+
+    def observe_raid(self, login: str) -> None:
+        """Prefetch a raider, the most likely next shoutout target"""
+        if self.config.get('SPECULATIVE_PREFETCH') and login:
+            self._submit(login.lower(), 'raid')
+
+    def _submit(self, login: str, reason: str) -> None:
+        """Schedule a prefetch on the API loop from the bot thread"""
+        if self.twitch_api.loop is not None:
+            self.twitch_api.submit(self.twitch_api.background(self._prefetch(login, reason)))
+
+    async def _prefetch(self, login: str, reason: str) -> None:
+        """Resolve and cache a chatter's content unless the hourly cap or Helix budget is spent"""
+        if self._recent.get(login):
+            return
+        self._recent.set(login, True, time.time() + float(self.config.get('PREFETCH_CHATTER_TTL')))
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # One prefetch at a time, so the request counter delta is attributable to it
+        async with self._lock:
+            hour_ago = time.time() - 60 * 60
+            while self._history and self._history[0][0] <= hour_ago:
+                self._history.popleft()
+            spent = sum(count for _, count in self._history)
+            expected = spent / len(self._history) if self._history else 0
+            if (len(self._history) >= int(self.config.get('PREFETCH_MAX_PER_HOUR')) or
+                    spent + expected >= int(self.config.get('PREFETCH_MAX_REQUESTS_PER_HOUR'))):
+                self.stats['over_budget'] += 1
+                return
+
+            first_request = self.twitch_api.stats['requests']
+            try:
+                user_id = await self.twitch_api.get_channel_id(login)
+                if user_id:
+                    await self.twitch_api.get_channel_content(user_id)
+            except Exception as e:
+                print(f"Error prefetching content for {login}: {str(e)}")
+            used = self.twitch_api.stats['requests'] - first_request
+
+        # Already warm channels cost nothing and do not count against the cap
+        if used:
+            self._history.append((time.time(), used))
+            self.stats['prefetched'] += 1
+            print(f"🔮 Speculative prefetch for {login} ({reason}): {used} Helix request(s)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prefetch counters and the Helix requests spent in the last hour"""
+        hour_ago = time.time() - 60 * 60
+        recent = [count for finished_at, count in list(self._history) if finished_at > hour_ago]
+        return dict(self.stats, last_hour=len(recent), last_hour_requests=sum(recent))
 
 
 class OBSController:
@@ -537,113 +1698,135 @@ class OBSController:
         self.config = config
         self.scene_name = "Twitch Auto"
         self.source_name = "TwitchVideo"
+        self._ws = None  # Persistent connection for browser source calls
+        self._ws_lock = threading.Lock()  # obsws is not safe to share between threads
 
-    def create_browser_source(self, video_url: str) -> None:
-        """Create or update browser source in OBS"""
-        ws = obsws(
-            self.config.get('OBS_HOST'),
-            self.config.get('OBS_PORT'),
-            self.config.get('OBS_PASSWORD')
-        )
-        try:
+    def _call_with_connection(self, action: Callable[[Any], Any]) -> Any:
+        """Run an action on the persistent connection, reconnecting once if it went stale"""
+        with self._ws_lock:
+            reused = self._ws is not None
+            try:
+                return action(self._connection())
+            except Exception:
+                self.disconnect()
+                if not reused:
+                    raise
+            # The reused connection may have been closed by OBS; retry on a fresh one
+            try:
+                return action(self._connection())
+            except Exception:
+                self.disconnect()
+                raise
+
+    def _connection(self):
+        """Get the persistent connection, opening it if needed"""
+        if self._ws is None:
+            ws = obsws(
+                self.config.get('OBS_HOST'),
+                self.config.get('OBS_PORT'),
+                self.config.get('OBS_PASSWORD')
+            )
             ws.connect()
+            self._ws = ws
+        return self._ws
 
-            # Try to remove existing source if it exists
+    def disconnect(self) -> None:
+        """Close the persistent connection"""
+        ws, self._ws = self._ws, None
+        if ws is not None:
             try:
-                scene_item_id = ws.call(obs_requests.GetSceneItemId(
-                    sceneName=self.scene_name,
-                    sourceName=self.source_name
-                )).datain.get('sceneItemId')
-
-                if scene_item_id:
-                    ws.call(obs_requests.RemoveSceneItem(
-                        sceneName=self.scene_name,
-                        sceneItemId=scene_item_id
-                    ))
-                    time.sleep(0.5)
+                ws.disconnect()
             except Exception:
-                pass  # Ignore if source doesn't exist
-
-            # Create new browser source
-            settings = {
-                "url": video_url + "&t=" + str(time.time()),
-                "width": 1920,
-                "height": 1080,
-                "css": "body { margin: 0; overflow: hidden; }",
-                "reroute_audio": False,
-                "restart_when_active": True
-            }
-
-            creation_response = ws.call(obs_requests.CreateInput(
-                sceneName=self.scene_name,
-                inputName=self.source_name,
-                inputKind="browser_source",
-                inputSettings=settings,
-                enabled=True
-            ))
+                pass
 
-            if not creation_response.status:
-                raise Exception("Failed to create OBS source")
+    def create_browser_source(self, video_url: str) -> None:
+        """Create or update browser source in OBS"""
+        try:
+            self._call_with_connection(lambda ws: self._create_browser_source(ws, video_url))
+        except Exception as e:
+            print(f"OBS Error: {str(e)}")
+            raise
 
-            # Set transform properties
-            time.sleep(1)
+    def _create_browser_source(self, ws, video_url: str) -> None:
+        """Replace the browser source using an open connection"""
+        # Try to remove existing source if it exists
+        try:
             scene_item_id = ws.call(obs_requests.GetSceneItemId(
                 sceneName=self.scene_name,
                 sourceName=self.source_name
             )).datain.get('sceneItemId')
 
-            if not scene_item_id:
-                raise Exception("Source not found")
-
-            ws.call(obs_requests.SetSceneItemTransform(
-                sceneName=self.scene_name,
-                sceneItemId=scene_item_id,
-                transform={
-                    "alignment": 5,
-                    "boundsAlignment": 5,
-                    "scaleX": 1.0,
-                    "scaleY": 1.0
-                }
-            ))
+            if scene_item_id:
+                ws.call(obs_requests.RemoveSceneItem(
+                    sceneName=self.scene_name,
+                    sceneItemId=scene_item_id
+                ))
+                time.sleep(0.5)
+        except Exception:
+            pass  # Ignore if source doesn't exist
+
+        # Create new browser source
+        settings = {
+            "url": video_url + "&t=" + str(time.time()),
+            "width": 1920,
+            "height": 1080,
+            "css": "body { margin: 0; overflow: hidden; }",
+            "reroute_audio": False,
+            "restart_when_active": True
+        }
 
-        except Exception as e:
-            print(f"OBS Error: {str(e)}")
-            raise
-        finally:
-            ws.disconnect()
+        creation_response = ws.call(obs_requests.CreateInput(
+            sceneName=self.scene_name,
+            inputName=self.source_name,
+            inputKind="browser_source",
+            inputSettings=settings,
+            enabled=True
+        ))
+
+        if not creation_response.status:
+            raise Exception("Failed to create OBS source")
+
+        # Set transform properties
+        time.sleep(1)
+        scene_item_id = ws.call(obs_requests.GetSceneItemId(
+            sceneName=self.scene_name,
+            sourceName=self.source_name
+        )).datain.get('sceneItemId')
+
+        if not scene_item_id:
+            raise Exception("Source not found")
+
+        ws.call(obs_requests.SetSceneItemTransform(
+            sceneName=self.scene_name,
+            sceneItemId=scene_item_id,
+            transform={
+                "alignment": 5,
+                "boundsAlignment": 5,
+                "scaleX": 1.0,
+                "scaleY": 1.0
+            }
+        ))
 
-    def remove_browser_source(self, time_to_sleep: int) -> None:
-        """Remove browser source after specified time"""
-        def delayed_remove():
-            print(self.config.get_message('bot.removing_video_in', seconds=time_to_sleep))
-            time.sleep(time_to_sleep + 1)
-            print(self.config.get_message('bot.removing_video'))
+    def remove_browser_source(self) -> None:
+        """Remove the browser source"""
+        print(self.config.get_message('bot.removing_video'))
 
-            ws = obsws(
-                self.config.get('OBS_HOST'),
-                self.config.get('OBS_PORT'),
-                self.config.get('OBS_PASSWORD')
-            )
-            try:
-                ws.connect()
+        def remove(ws):
+            scene_item_id = ws.call(obs_requests.GetSceneItemId(
+                sceneName=self.scene_name,
+                sourceName=self.source_name
+            )).datain.get('sceneItemId')
 
-                scene_item_id = ws.call(obs_requests.GetSceneItemId(
+            if scene_item_id:
+                ws.call(obs_requests.RemoveSceneItem(
                     sceneName=self.scene_name,
-                    sourceName=self.source_name
-                )).datain.get('sceneItemId')
-
-                if scene_item_id:
-                    ws.call(obs_requests.RemoveSceneItem(
-                        sceneName=self.scene_name,
-                        sceneItemId=scene_item_id
-                    ))
-            except Exception as e:
-                print(f"Error removing scene: {str(e)}")
-            finally:
-                ws.disconnect()
+                    sceneItemId=scene_item_id
+                ))
 
-        # Start removal in a separate thread to not block
-        threading.Thread(target=delayed_remove, daemon=True).start()
+        try:
+            self._call_with_connection(remove)
+        except Exception as e:
+            print(f"Error removing scene: {str(e)}")
 
     def create_audio_source(self, audio_path: str, duration: float):
         """Create audio source in OBS for playback"""
@@ -820,18 +2003,509 @@ class OBSController:
         threading.Thread(target=create_and_remove, daemon=True).start()
 
 
+class QueueJournal:
+    """Class to persist playback queue changes in an append-only journal"""
+
+    def __init__(self, config: Config):
+        """Initialize queue journal"""
+        self.config = config
+        self.path = config.get('QUEUE_JOURNAL_PATH')
+        self._records = queue.Queue()  # Records waiting for the writer thread; None stops it
+        self._pending = OrderedDict()  # Replayed queue state: lowercase login -> (channel, priority)
+        self._appended = 0  # Records written since the last compaction
+        self._writer: Optional[threading.Thread] = None
+
+    def open(self) -> List[Tuple[str, str]]:
+        """Replay and compact the journal, start the writer and return the pending (channel, priority) pairs"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        break  # Torn write from a crash; nothing after it was committed
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error reading queue journal: {str(e)}")
+
+        self._compact()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        return list(self._pending.values())
+
+    def append(self, op: str, channel: Optional[str] = None, priority: Optional[str] = None) -> None:
+        """Hand a record to the writer thread without waiting for the disk"""
+        record = {'op': op}
+        if channel is not None:
+            record['channel'] = channel
+        if priority is not None:
+            record['priority'] = priority
+        self._records.put(record)
+
+    def close(self) -> None:
+        """Write out the remaining records and stop the writer thread"""
+        if self._writer is not None:
+            self._records.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply a journal record to the replayed queue state"""
+        op = record.get('op')
+        key = record.get('channel', '').lower()
+        if op == 'enqueue':
+            # A channel enqueued again moved lanes; it now follows everything queued before the move
+            self._pending.pop(key, None)
+            self._pending[key] = (record['channel'], record.get('priority', 'normal'))
+        elif op in ('dequeue', 'remove'):
+            self._pending.pop(key, None)
+        elif op == 'clear':
+            self._pending.clear()
+
+    def _write_loop(self) -> None:
+        """Append queued records in groups, with one fsync per group"""
+        while True:
+            batch = [self._records.get()]
+            # Group commit: collect whatever arrives within the flush interval
+            deadline = time.monotonic() + float(self.config.get('QUEUE_JOURNAL_FLUSH_INTERVAL'))
+            while batch[-1] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._records.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            records = [record for record in batch if record is not None]
+            if records:
+                try:
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(''.join(json.dumps(record) + '\n' for record in records))
+                        f.flush()
+                        os.fsync(f.fileno())
+                except Exception as e:
+                    print(f"Error writing queue journal: {str(e)}")
+                for record in records:
+                    self._apply(record)
+                self._appended += len(records)
+                if self._appended >= int(self.config.get('QUEUE_JOURNAL_COMPACT_EVERY')):
+                    self._compact()
+
+            if batch[-1] is None:
+                return
+
+    def _compact(self) -> None:
+        """Rewrite the journal as one enqueue record per pending channel"""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for channel, priority in self._pending.values():
+                    f.write(json.dumps({'op': 'enqueue', 'channel': channel, 'priority': priority}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._appended = 0
+        except Exception as e:
+            print(f"Error compacting queue journal: {str(e)}")
+
+
+class PlaybackQueue:
+    """Class to hold queued channels in priority lanes, collapsing duplicates"""
+
+    LANES = ('high', 'normal')  # Served in this order
+
+    def __init__(self, config: Config, journal: Optional[QueueJournal] = None):
+        """Initialize playback queue"""
+        self.config = config
+        self._journal = journal
+        self.lock = threading.Lock()  # Guards the lanes and current item against Flask request threads
+        self.current: Optional[str] = None  # Channel being resolved or played
+        self._lanes = {lane: deque() for lane in self.LANES}
+        self._index: Dict[str, str] = {}  # Lane of each queued channel, by lowercase login
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def push(self, channel: str, priority: str = 'normal') -> Tuple[str, Optional[int]]:
+        """Queue a channel, returning its status (queued, moved, duplicate or full) and 1-based position"""
+        lane = priority if priority in self._lanes else 'normal'
+        key = channel.lower()
+        max_length = int(self.config.get('QUEUE_MAX_LENGTH'))
+        with self.lock:
+            if self.current is not None and self.current.lower() == key:
+                return 'duplicate', 1
+            if key in self._index:
+                if lane == self._index[key] or self.LANES.index(lane) > self.LANES.index(self._index[key]):
+                    return 'duplicate', self._position(key)
+                # Already waiting in a lower lane: move it up, keeping a single entry
+                items = self._lanes[self._index[key]]
+                queued = next(item for item in items if item.lower() == key)
+                items.remove(queued)
+                self._lanes[lane].append(queued)
+                self._index[key] = lane
+                if self._journal is not None:
+                    self._journal.append('enqueue', queued, lane)
+                return 'moved', self._position(key)
+            if 0 < max_length <= len(self._index):
+                return 'full', None
+            self._lanes[lane].append(channel)
+            self._index[key] = lane
+            if self._journal is not None:
+                self._journal.append('enqueue', channel, lane)
+            return 'queued', self._position(key)
+
+    def restore(self, items: List[Tuple[str, str]]) -> None:
+        """Put back channels replayed from the journal, ahead of anything queued since"""
+        with self.lock:
+            for channel, priority in reversed(items):
+                lane = priority if priority in self._lanes else 'normal'
+                if channel.lower() not in self._index:
+                    self._lanes[lane].appendleft(channel)
+                    self._index[channel.lower()] = lane
+
+    def pop(self) -> Optional[str]:
+        """Take the next channel and mark it as current, or return None if the queue is empty"""
+        with self.lock:
+            self.current = None
+            for lane in self.LANES:
+                if self._lanes[lane]:
+                    self.current = self._lanes[lane].popleft()
+                    del self._index[self.current.lower()]
+                    break
+            return self.current
+
+    def finish(self) -> None:
+        """Mark the current channel as done"""
+        with self.lock:
+            if self.current is not None and self._journal is not None:
+                self._journal.append('dequeue', self.current)
+            self.current = None
+
+    def remove(self, channel: str) -> bool:
+        """Remove a queued channel, returning whether it was queued"""
+        key = channel.lower()
+        with self.lock:
+            lane = self._index.pop(key, None)
+            if lane is None:
+                return False
+            items = self._lanes[lane]
+            items.remove(next(item for item in items if item.lower() == key))
+            if self._journal is not None:
+                self._journal.append('remove', channel)
+            return True
+
+    def clear(self) -> int:
+        """Remove every queued channel and return how many were removed"""
+        with self.lock:
+            count = len(self._index)
+            for items in self._lanes.values():
+                items.clear()
+            self._index.clear()
+            if self._journal is not None:
+                self._journal.append('clear')
+            return count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the current channel and every queued channel with its priority and position"""
+        with self.lock:
+            offset = 1 if self.current is not None else 0
+            items = []
+            for lane in self.LANES:
+                for channel in self._lanes[lane]:
+                    items.append({'channel': channel, 'priority': lane, 'position': offset + len(items) + 1})
+            return {'current': self.current, 'items': items}
+
+    def peek(self, count: int) -> List[str]:
+        """Get the next queued channels without removing them"""
+        with self.lock:
+            upcoming = []
+            for lane in self.LANES:
+                upcoming.extend(itertools.islice(self._lanes[lane], count - len(upcoming)))
+            return upcoming
+
+    def _position(self, key: str) -> int:
+        """Get the position of a queued channel, counting the current one; the caller holds the lock"""
+        offset = 1 if self.current is not None else 0
+        for lane in self.LANES:
+            items = self._lanes[lane]
+            if self._index[key] == lane:
+                if items[-1].lower() == key:
+                    return offset + len(items)  # Just queued: the common case is O(1)
+                return offset + 1 + next(i for i, item in enumerate(items) if item.lower() == key)
+            offset += len(items)
+
+
+class QueueEventBus:
+    """Class to fan queue and playback events out to stream subscribers"""
+
+    def __init__(self, max_backlog: int = 100):
+        """Initialize event bus"""
+        self.max_backlog = max_backlog
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> queue.Queue:
+        """Register a subscriber and return the queue its events are delivered to"""
+        subscriber = queue.Queue(self.max_backlog)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        """Stop delivering events to a subscriber"""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """Deliver an event to every subscriber from any thread, dropping subscribers that fell behind"""
+        message = {'event': event, 'data': dict(data, timestamp=time.time())}
+        with self._lock:
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # Make room for the end-of-stream marker so the reader disconnects
+                    self._subscribers.discard(subscriber)
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+                    subscriber.put_nowait(None)
+
+
+class PlaybackScheduler:
+    """Class to play queued shoutouts one after another on the Twitch API event loop"""
+
+    def __init__(self, config: Config, twitch_api: TwitchAPI, obs_controller: OBSController):
+        """Initialize playback scheduler"""
+        self.config = config
+        self.twitch_api = twitch_api
+        self.obs_controller = obs_controller
+        # Optional journal so queued shoutouts survive restarts (QUEUE_JOURNAL_PATH)
+        self.journal = QueueJournal(config) if config.get('QUEUE_JOURNAL_PATH') else None
+        self.queue = PlaybackQueue(config, self.journal)
+        if self.journal is not None:
+            restored = self.journal.open()
+            self.queue.restore(restored)
+            if restored:
+                print(f"♻️ Restored {len(restored)} queued shoutout(s) from {self.journal.path}")
+        self.events = QueueEventBus()
+        self.now_playing: Optional[ContentItem] = None
+        self._playback_id: Optional[str] = None  # Identifies the player page of the current item
+
+        # Owned by the API loop
+        self._prefetched: Dict[str, asyncio.Task] = {}  # Look-ahead resolutions by channel
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None  # Set when items are enqueued
+        self._interrupt: Optional[asyncio.Event] = None  # Set to end the current playback early
+        self._interrupt_reason: Optional[str] = None  # skipped, ended or error
+
+    def start(self) -> None:
+        """Start playing channels restored from the journal"""
+        if len(self.queue):
+            self.twitch_api.loop.call_soon_threadsafe(self._wake)
+
+    def close(self) -> None:
+        """Flush the queue journal"""
+        if self.journal is not None:
+            self.journal.close()
+
+    def enqueue(self, channels: List[str], priority: str = 'normal') -> List[Tuple[str, Optional[int]]]:
+        """Add channels to the queue from any thread and return their statuses and queue positions"""
+        results = []
+        for channel in channels:
+            status, position = self.queue.push(channel, priority)
+            if status == 'queued':
+                self.events.publish('enqueued', {'channel': channel, 'priority': priority, 'position': position})
+            elif status == 'moved':
+                self.events.publish('moved', {'channel': channel, 'priority': priority, 'position': position})
+            results.append((status, position))
+        self.twitch_api.loop.call_soon_threadsafe(self._wake)
+        return results
+
+    def remove(self, channel: str) -> bool:
+        """Remove a queued channel from any thread, returning whether it was queued"""
+        if not self.queue.remove(channel):
+            return False
+        self.events.publish('removed', {'channel': channel})
+        self.twitch_api.loop.call_soon_threadsafe(self._drop_prefetched, channel)
+        return True
+
+    def clear(self) -> int:
+        """Remove every queued channel from any thread and return how many were removed"""
+        count = self.queue.clear()
+        self.events.publish('cleared', {'count': count})
+        self.twitch_api.loop.call_soon_threadsafe(self._drop_prefetched)
+        return count
+
+    def skip(self) -> bool:
+        """End the current playback from any thread, returning whether anything was playing"""
+        channel = self.queue.current
+        if channel is None:
+            return False
+        self.events.publish('skipped', {'channel': channel})
+        self.twitch_api.loop.call_soon_threadsafe(self._interrupt_playback, 'skipped')
+        return True
+
+    def playback_ended(self, playback_id: str, reason: str) -> bool:
+        """Advance the queue when a player page reports its item ended, returning whether it was current"""
+        if playback_id != self._playback_id:
+            return False
+        self.twitch_api.loop.call_soon_threadsafe(self._interrupt_playback, reason)
+        return True
+
+    def player_content(self, playback_id: str) -> Optional[ContentItem]:
+        """Get the item a player page should show, or None if that playback is over"""
+        now_playing = self.now_playing
+        return now_playing if playback_id == self._playback_id else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the queue contents and the content being played"""
+        snapshot = self.queue.snapshot()
+        now_playing = self.now_playing
+        snapshot['content'] = now_playing.to_dict() if now_playing is not None else None
+        return snapshot
+
+    def _wake(self) -> None:
+        """Start the worker if needed and let it pick up new queue items"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._interrupt = asyncio.Event()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self.run())
+        self._wakeup.set()
+        self._prefetch_upcoming()
+
+    def _interrupt_playback(self, reason: str) -> None:
+        """Wake the worker out of the current playback wait"""
+        if self._interrupt is not None and not self._interrupt.is_set():
+            self._interrupt_reason = reason
+            self._interrupt.set()
+
+    def _drop_prefetched(self, channel: Optional[str] = None) -> None:
+        """Cancel look-ahead resolutions of a channel, or of all channels, that are no longer queued"""
+        keys = [channel.lower()] if channel is not None else list(self._prefetched)
+        for key in keys:
+            resolution = self._prefetched.pop(key, None)
+            if resolution is not None:
+                resolution.cancel()
+
+    async def run(self) -> None:
+        """Play queued channels until the queue is empty, then wait for more"""
+        while True:
+            channel = self.queue.pop()
+            if channel is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            self._interrupt.clear()  # A skip from here on applies to this channel
+            self._interrupt_reason = None
+            resolution = self._prefetched.pop(channel.lower(), None)
+            if resolution is not None and not resolution.done():
+                # Someone is waiting on this one now; resolve it at interactive priority instead
+                resolution.cancel()
+                resolution = None
+            # Resolve the next items while this one plays
+            self._prefetch_upcoming()
+
+            try:
+                selected = await (resolution if resolution is not None else self.resolve_channel(channel))
+                self.events.publish('resolved', {
+                    'channel': channel,
+                    'content': selected.to_dict() if selected else None
+                })
+                if selected and not self._interrupt.is_set():
+                    await self.play(channel, selected)
+            except Exception as e:
+                print(f"Error processing queue item: {str(e)}") # Keep f-string for error details
+                traceback.print_exc()
+            finally:
+                self.queue.finish()
+
+    async def play(self, channel: str, selected: ContentItem) -> None:
+        """Show an item in OBS, wait for it to end or be skipped, then remove it"""
+        loop = asyncio.get_running_loop()
+        self.now_playing = selected
+        self._playback_id = secrets.token_urlsafe(8)
+
+        if self.config.get('PLAYER_PAGE'):
+            # Our player page reports when the item ends; the duration is only a fallback
+            base_url = self.config.get('PLAYER_BASE_URL').rstrip('/')
+            parent = urllib.parse.urlparse(base_url).hostname
+            source_url = f"{base_url}/player/{self._playback_id}?parent={parent}"
+            timeout = selected.duration_seconds + float(self.config.get('PLAYER_ENDED_TIMEOUT'))
+        else:
+            # The Twitch embed sends no end signal, so remove it right after its duration
+            source_url = selected.embed_url
+            timeout = selected.duration_seconds + 1
+
+        try:
+            await loop.run_in_executor(None, self.obs_controller.create_browser_source, source_url)
+            self.events.publish('started', {'channel': channel, 'content': selected.to_dict()})
+
+            print(self.config.get_message('bot.removing_video_in', seconds=selected.duration_seconds))
+            try:
+                await asyncio.wait_for(self._interrupt.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            await loop.run_in_executor(None, self.obs_controller.remove_browser_source)
+        finally:
+            self.now_playing = None
+            self._playback_id = None
+            reason = self._interrupt_reason or 'timeout'
+            self.events.publish('finished', {
+                'channel': channel,
+                'content': selected.to_dict(),
+                'reason': reason,
+                'skipped': reason == 'skipped'
+            })
+
+    async def resolve_channel(self, channel: str) -> Optional[ContentItem]:
+        """Resolve a channel and pick the content to play, or None if there is nothing to play"""
+        user_id = await self.twitch_api.get_channel_id(channel)
+        if not user_id:
+            print(self.config.get_message('bot.channel_not_found', channel=channel))
+            return None
+
+        content_list = await self.twitch_api.get_channel_content(user_id)
+        if not content_list:
+            print(self.config.get_message('bot.no_content_found', channel=channel))
+            return None
+
+        return random.choice(content_list)
+
+    def _prefetch_upcoming(self) -> None:
+        """Start resolving the next PREFETCH_DEPTH queued channels behind the one about to play"""
+        depth = int(self.config.get('PREFETCH_DEPTH'))
+        # With nothing current the worker pops the head right away and resolves it interactively
+        skip = 1 if self.queue.current is None else 0
+        for channel in self.queue.peek(depth + skip)[skip:]:
+            key = channel.lower()
+            if key not in self._prefetched:
+                self._prefetched[key] = asyncio.ensure_future(
+                    self.twitch_api.background(self.resolve_channel(channel))
+                )
+
+
 class TwitchBot(commands.Bot):
     """Twitch bot for handling chat commands"""
 
     def __init__(self, token: str, config: Config, token_manager: TokenManager,
-                 time_blocker: TimeBlocker, command_logger: CommandLogger):
+                 time_blocker: TimeBlocker, command_logger: CommandLogger,
+                 prefetcher: Optional[SpeculativePrefetcher] = None):
         """Initialize Twitch bot"""
         self.config = config
         self.token_manager = token_manager
         self.time_blocker = time_blocker
         self.command_logger = command_logger
+        self.prefetcher = prefetcher
         self.restart_event = threading.Event()
         self.commands_config = self.load_commands_config()
+        self._token_refresh_task = None
 
         print(self.commands_config)
 
@@ -870,12 +2544,27 @@ class TwitchBot(commands.Bot):
         """Monitor for restart signal"""
         while not self.restart_event.is_set():
             await asyncio.sleep(1)
+        if self._token_refresh_task:
+            self._token_refresh_task.cancel()
         await self.close()
 
     async def start(self):
-        """Start the bot with restart monitoring"""
+        """Start the bot with restart monitoring and proactive token refresh"""
         self.loop.create_task(self.monitor_restart())
-        await super().start()
+        self._token_refresh_task = self.loop.create_task(
+            self.token_manager.run_refresh_scheduler(self.on_token_refreshed)
+        )
+        try:
+            await super().start()
+        finally:
+            # run_bot reuses this loop after a failed start; don't leave a scheduler refreshing for a dead bot
+            self._token_refresh_task.cancel()
+
+    def on_token_refreshed(self, token: str) -> None:
+        """Use the refreshed token for any future reconnects"""
+        self.token = token
+        self._connection._token = token
+        self._http.token = token
 
     async def event_ready(self):
         """Called when the bot is ready"""
@@ -922,6 +2611,9 @@ class TwitchBot(commands.Bot):
             print("🔄 Mensagem é echo, ignorando")
             return
 
+        if self.prefetcher is not None and message.author.name.lower() != self.config.get('TWITCH_USERNAME').lower():
+            self.prefetcher.observe_chatter(message.author.name)
+
         if not message.content.startswith('!'):
             print(f"❌ Mensagem não começa com prefixo '!', ignorando")
             return
@@ -941,6 +2633,11 @@ class TwitchBot(commands.Bot):
             print(f"❌ Comando '{command_name}' não encontrado nos comandos dinâmicos")
             print(f"Comandos disponíveis: {list(self.commands_config.keys())}")
 
+    async def event_raw_usernotice(self, channel, tags: dict):
+        """Handle USERNOTICE events such as raids"""
+        if self.prefetcher is not None and tags.get('msg-id') == 'raid':
+            self.prefetcher.observe_raid(tags.get('msg-param-login'))
+
     async def handle_dynamic_command(self, message, command_name, args):
         """Dynamically handle a command based on the loaded configuration."""
         if not self.is_user_authorized(message):
@@ -1009,7 +2706,9 @@ class FlaskApp:
     """Flask web application for configuration and API endpoints"""
 
     def __init__(self, config: Config, token_manager: TokenManager,
-                 twitch_api: TwitchAPI, obs_controller: OBSController):
+                 twitch_api: TwitchAPI, obs_controller: OBSController,
+                 cache_warmer: Optional[CacheWarmer] = None,
+                 prefetcher: Optional[SpeculativePrefetcher] = None):
         """Initialize Flask app"""
         self.app = Flask(__name__)
         CORS(self.app)
@@ -1017,13 +2716,11 @@ class FlaskApp:
         self.token_manager = token_manager
         self.twitch_api = twitch_api
         self.obs_controller = obs_controller
-        self.selected_video_duration = 0
+        self.cache_warmer = cache_warmer
+        self.prefetcher = prefetcher
 
         # Command queue system
-        self.command_queue = []
-        self.is_playing = False
-        self.queue_lock = threading.Lock()
-        self.queue_processor_thread = None
+        self.scheduler = PlaybackScheduler(config, twitch_api, obs_controller)
 
         # Register routes
         self.register_routes()
@@ -1088,33 +2785,34 @@ class FlaskApp:
             """API endpoint to play a random video"""
             try:
                 data = request.json
-                channel = data.get('channel')
-                if not channel:
+                # Accept a single channel or a list of channels from a multi-channel !so
+                channels = [c for c in (data.get('channels') or [data.get('channel')]) if c]
+                if not channels:
                     return jsonify({'error': self.config.get_message('errors.channel_name_required')}), 400
 
-                # Add the channel to the queue
-                with self.queue_lock:
-                    self.command_queue.append(channel)
+                # Resolve all channel IDs in one batched Helix request before they reach the queue
+                if len(channels) > 1:
+                    self.twitch_api.submit(self.twitch_api.get_channel_ids(channels))
 
-                    # Start the queue processor if it's not already running
-                    if not self.is_playing:
-                        self.queue_processor_thread = threading.Thread(
-                            target=self.process_queue,
-                            daemon=True
-                        )
-                        self.queue_processor_thread.start()
+                # Add the channels to the queue; the scheduler starts playing right away if idle
+                priority = 'high' if data.get('priority') == 'high' else 'normal'
+                results = self.scheduler.enqueue(channels, priority)
+                queue_statuses = [status for status, _ in results]
+                queue_positions = [position for _, position in results]
 
                 # Use localized messages for response
-                queue_position = len(self.command_queue)
-                if queue_position > 1:
-                    message = self.config.get_message('bot.add_to_queue', channel_name=channel, queue_position=queue_position)
-                else:
-                    message = self.config.get_message('bot.playing_now', channel_name=channel)
+                messages = [self._queue_message(channel, status, position)
+                            for channel, (status, position) in zip(channels, results)]
+                if all(status == 'full' for status in queue_statuses):
+                    return jsonify({'error': messages[0], 'queue_statuses': queue_statuses}), 429
 
                 return jsonify({
                     'status': 'success',
-                    'message': message,
-                    'queue_position': queue_position
+                    'message': messages[0],
+                    'messages': messages,
+                    'queue_position': queue_positions[0],
+                    'queue_positions': queue_positions,
+                    'queue_statuses': queue_statuses
                 }), 200
 
             except Exception as e:
@@ -1151,9 +2849,7 @@ class FlaskApp:
         def clean_queue():
             """API endpoint to clean the command queue"""
             try:
-                with self.queue_lock:
-                    queue_size = len(self.command_queue)
-                    self.command_queue.clear()
+                queue_size = self.scheduler.clear()
 
                 # Use localized message for response
                 message = self.config.get_message('bot.queue_cleared', count=queue_size)
@@ -1169,6 +2865,83 @@ class FlaskApp:
                 error_msg = self.config.get_message('bot.clear_queue_error', error_msg=str(e)) # Assuming error_msg placeholder in lang file
                 return jsonify({'error': error_msg}), 500
 
+        @self.app.route('/queue')
+        def queue_contents():
+            """API endpoint listing the item being played and the queued channels"""
+            return jsonify(self.scheduler.snapshot()), 200
+
+        @self.app.route('/queue/<channel>', methods=['DELETE'])
+        def remove_from_queue(channel):
+            """API endpoint removing a channel from the queue"""
+            if not self.scheduler.remove(channel):
+                return jsonify({'error': self.config.get_message('bot.not_in_queue', channel_name=channel)}), 404
+            return jsonify({'status': 'success', 'channel': channel}), 200
+
+        @self.app.route('/queue/skip', methods=['POST'])
+        def skip_current():
+            """API endpoint ending the current playback so the next item starts"""
+            return jsonify({'status': 'success', 'skipped': self.scheduler.skip()}), 200
+
+        @self.app.route('/player/<playback_id>')
+        def player(playback_id):
+            """Player page for the OBS browser source, reporting back when the item ends"""
+            content = self.scheduler.player_content(playback_id)
+            parent = request.args.get('parent') or request.host.split(':')[0]
+            return render_template("player.html",
+                                   playback_id=playback_id,
+                                   parent=parent,
+                                   content=content.to_dict() if content else None,
+                                   clip_url=content.player_url(parent) if content else None,
+                                   load_timeout=float(self.config.get('PLAYER_LOAD_TIMEOUT')))
+
+        @self.app.route('/player/<playback_id>/ended', methods=['POST'])
+        def player_ended(playback_id):
+            """Playback-ended callback from the player page"""
+            reason = (request.get_json(silent=True) or {}).get('reason')
+            if not self.scheduler.playback_ended(playback_id, 'error' if reason == 'error' else 'ended'):
+                return jsonify({'error': 'Unknown or finished playback'}), 404
+            return jsonify({'status': 'success'}), 200
+
+        @self.app.route('/queue/events')
+        def queue_events():
+            """Server-sent event stream of queue and playback events"""
+            subscriber = self.scheduler.events.subscribe()
+            keepalive = float(self.config.get('QUEUE_EVENTS_KEEPALIVE'))
+
+            def stream():
+                try:
+                    # Start with the full state so clients need no separate GET /queue
+                    yield f"event: snapshot\ndata: {json.dumps(self.scheduler.snapshot())}\n\n"
+                    while True:
+                        try:
+                            message = subscriber.get(timeout=keepalive)
+                        except queue.Empty:
+                            yield ": keepalive\n\n"
+                            continue
+                        if message is None:
+                            return
+                        yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+                finally:
+                    self.scheduler.events.unsubscribe(subscriber)
+
+            return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+        @self.app.route('/stats')
+        def stats():
+            """API endpoint exposing Twitch API statistics"""
+            stats = self.twitch_api.get_stats()
+            if self.cache_warmer is not None:
+                stats['last_warmup'] = self.cache_warmer.last_warmup
+            if self.prefetcher is not None:
+                stats['speculative_prefetch'] = self.prefetcher.get_stats()
+            return jsonify(stats), 200
+
+        @self.app.route('/stats/yield')
+        def yield_stats():
+            """API endpoint exposing per-channel content type yield statistics"""
+            return jsonify(self.twitch_api.run(self.twitch_api.get_yield_stats(), timeout=10)), 200
+
         @self.app.route('/config', methods=['GET', 'POST'])
         def config_editor():
             """Configuration web interface"""
@@ -1230,50 +3003,16 @@ class FlaskApp:
                                          message=message,
                                          message_type=message_type)
 
-    def process_queue(self):
-        """Process the command queue"""
-        while True:
-            with self.queue_lock:
-                if not self.command_queue:
-                    self.is_playing = False
-                    return
-
-                self.is_playing = True
-                channel = self.command_queue.pop(0)
-
-            # Create a new event loop for this thread if one doesn't exist
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            try:
-                user_id = asyncio.run(self.twitch_api.get_channel_id(channel))
-                if not user_id:
-                    print(self.config.get_message('bot.channel_not_found', channel=channel))
-                    continue
-
-                content_list = asyncio.run(self.twitch_api.get_channel_content(user_id))
-                if not content_list:
-                    print(self.config.get_message('bot.no_content_found', channel=channel))
-                    continue
-
-                selected = random.choice(content_list)
-                self.selected_video_duration = selected['duration_seconds']
-
-                # Play the video
-                self.obs_controller.create_browser_source(selected['embed_url'])
-
-                # Schedule removal after video duration
-                self.obs_controller.remove_browser_source(self.selected_video_duration)
-
-                # Wait for the video to finish before processing next item
-                time.sleep(self.selected_video_duration + 2)
-
-            except Exception as e:
-                print(f"Error processing queue item: {str(e)}") # Keep f-string for error details
-                traceback.print_exc()
+    def _queue_message(self, channel: str, status: str, position: Optional[int]) -> str:
+        """Get the localized message for the outcome of queueing a channel"""
+        if status == 'full':
+            return self.config.get_message('bot.queue_full', channel_name=channel,
+                                           max_length=self.config.get('QUEUE_MAX_LENGTH'))
+        if position == 1:
+            return self.config.get_message('bot.playing_now', channel_name=channel)
+        if status == 'duplicate':
+            return self.config.get_message('bot.already_in_queue', channel_name=channel, queue_position=position)
+        return self.config.get_message('bot.add_to_queue', channel_name=channel, queue_position=position)
 
     def run(self, host='0.0.0.0', port=5000):
         """Run the Flask app"""
@@ -1292,7 +3031,10 @@ class Application:
         self.command_logger = CommandLogger(self.config)
         self.twitch_api = TwitchAPI(self.config, self.token_manager)
         self.obs_controller = OBSController(self.config)
-        self.flask_app = FlaskApp(self.config, self.token_manager, self.twitch_api, self.obs_controller)
+        self.cache_warmer = CacheWarmer(self.config, self.twitch_api, self.command_logger)
+        self.prefetcher = SpeculativePrefetcher(self.config, self.twitch_api, self.cache_warmer)
+        self.flask_app = FlaskApp(self.config, self.token_manager, self.twitch_api, self.obs_controller,
+                                  cache_warmer=self.cache_warmer, prefetcher=self.prefetcher)
 
         self.restart_bot_event = threading.Event()
         self.app_should_restart = threading.Event()
@@ -1343,7 +3085,8 @@ class Application:
                                 config=self.config,
                                 token_manager=self.token_manager,
                                 time_blocker=self.time_blocker,
-                                command_logger=self.command_logger)
+                                command_logger=self.command_logger,
+                                prefetcher=self.prefetcher)
                 bot.restart_event = self.restart_bot_event
 
                 # The token is set during super().__init__ now.
@@ -1367,6 +3110,9 @@ class Application:
         # Load configuration
         self.config.load()
 
+        # Open the pooled Twitch API session for the app's lifetime
+        self.twitch_api.start()
+
         # Start Flask server in a separate thread
         flask_thread = threading.Thread(target=self.run_flask)
         flask_thread.daemon = True
@@ -1396,6 +3142,12 @@ class Application:
         else:
             print(f"\n{self.config.get_message('config.loaded_success')}\n")
 
+        # Warm the caches with the most shouted-out channels now that credentials are set
+        self.twitch_api.submit(self.cache_warmer.run())
+
+        # Resume shoutouts that were still queued when the app last stopped
+        self.flask_app.scheduler.start()
+
         # Start bot in a separate thread
         bot_thread = threading.Thread(target=self.run_bot)
         bot_thread.daemon = True
@@ -1406,6 +3158,9 @@ class Application:
                 time.sleep(1) # Keep the main thread alive
         except KeyboardInterrupt:
             print(self.config.get_message('app.shutting_down'))
+            self.twitch_api.close()
+            self.obs_controller.disconnect()
+            self.flask_app.scheduler.close()
 
 
 
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import so_bot  # noqa: E402
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Default configuration in a temporary file, with the repo's language files available"""
+    monkeypatch.chdir(REPO_ROOT)
+    return so_bot.Config(str(tmp_path / "config.yaml"))
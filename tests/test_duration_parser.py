@@ -0,0 +1,62 @@
+import random
+import re
+
+import pytest
+
+import so_bot
+
+
+def legacy_interval_string_to_seconds(input_str: str) -> int:
+    """The parser replaced by _parse_twitch_duration, kept as the reference implementation"""
+    suffix_map = {
+        'y': 'y', 'year': 'y', 'years': 'y',
+        'w': 'w', 'week': 'w', 'weeks': 'w',
+        'd': 'd', 'day': 'd', 'days': 'd',
+        'h': 'h', 'hour': 'h', 'hours': 'h',
+        'm': 'm', 'minute': 'm', 'minutes': 'm',
+        's': 's', 'second': 's', 'seconds': 's',
+    }
+    suffix_multiples = {
+        'y': 60 * 60 * 24 * 365,
+        'w': 60 * 60 * 24 * 7,
+        'd': 60 * 60 * 24,
+        'h': 60 * 60,
+        'm': 60,
+        's': 1,
+    }
+    total = 0
+    pattern = re.compile(r'(\d+)[\s,]*([a-zA-Z]+)')
+    for match in pattern.finditer(input_str):
+        amount = int(match.group(1))
+        suffix = match.group(2).lower()
+        if suffix not in suffix_map:
+            raise ValueError(f'Invalid interval: {input_str}')
+        index = suffix_map[suffix]
+        total += amount * suffix_multiples[index]
+    return total
+
+
+TOKENS = ['0', '1', '7', '12', '59', '123', 'h', 'm', 's', 'd', 'w', 'y', 'H', 'M', 'S',
+          'hours', 'minute', 'Seconds', 'days', 'weeks', 'year', 'x', 'ms', ' ', ',', ', ', '-', ':']
+
+
+def outcome(parse, value):
+    try:
+        return parse(value)
+    except ValueError as e:
+        return type(e)
+
+
+@pytest.mark.parametrize('value, seconds', [
+    ('1h2m3s', 3723), ('45s', 45), ('10m', 600), ('3h', 10800), ('2h5s', 7205), ('', 0),
+])
+def test_canonical_durations(value, seconds):
+    assert so_bot._parse_twitch_duration(value) == seconds
+
+
+def test_matches_previous_implementation_on_random_strings():
+    rng = random.Random(14)
+    so_bot._parse_twitch_duration.cache_clear()
+    for _ in range(50000):
+        value = ''.join(rng.choice(TOKENS) for _ in range(rng.randint(0, 8)))
+        assert outcome(so_bot._parse_twitch_duration, value) == outcome(legacy_interval_string_to_seconds, value), value
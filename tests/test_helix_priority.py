@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import so_bot
+
+RATE_LIMITED = {'Ratelimit-Limit': '800', 'Ratelimit-Remaining': '50'}  # Below the background reserve
+
+
+async def token_endpoint(request):
+    return web.json_response({'access_token': 'app', 'expires_in': 3600})
+
+
+async def users_endpoint(request):
+    data = [{'id': '42', 'login': login, 'created_at': '2020-01-01T00:00:00Z'} for login in request.query.getall('login')]
+    return web.json_response({'data': data}, headers=dict(RATE_LIMITED, **{'Ratelimit-Reset': str(int(time.time()) + 60)}))
+
+
+async def clips_endpoint(request):
+    data = [{'id': 'clip', 'duration': 20, 'view_count': 1}]
+    return web.json_response({'data': data, 'pagination': {}},
+                             headers=dict(RATE_LIMITED, **{'Ratelimit-Reset': str(int(time.time()) + 60)}))
+
+
+def run_rate_limited(config, monkeypatch, tmp_path, scenario):
+    """Run scenario(api) on the API loop with the Helix bucket held below the background reserve"""
+    config.config['CONTENT_TYPES'] = ['clip']
+    api = so_bot.TwitchAPI(config, so_bot.TokenManager(config, str(tmp_path / "tokens.yaml")))
+    api.start()
+
+    async def serve():
+        app = web.Application()
+        app.router.add_post('/oauth2/token', token_endpoint)
+        app.router.add_get('/helix/users', users_endpoint)
+        app.router.add_get('/helix/clips', clips_endpoint)
+        async with TestServer(app) as server:
+            monkeypatch.setattr(so_bot, 'TWITCH_TOKEN_URL', str(server.make_url('/oauth2/token')))
+            monkeypatch.setattr(so_bot, 'HELIX_BASE_URL', str(server.make_url('/helix')))
+            api._rate_limiter.remaining = 50
+            api._rate_limiter.reset_at = time.time() + 60
+            return await scenario(api)
+
+    try:
+        return api.run(serve(), timeout=30)
+    finally:
+        api.close()
+
+
+async def join_background_flight(api, call):
+    background = asyncio.ensure_future(api.background(call()))
+    await asyncio.sleep(0.3)
+    assert not background.done()  # Held behind the reserve
+    result = await asyncio.wait_for(call(), 5)
+    assert await asyncio.wait_for(background, 5) == result
+    return result
+
+
+def test_interactive_caller_raises_coalesced_content_load(config, monkeypatch, tmp_path):
+    content = run_rate_limited(config, monkeypatch, tmp_path,
+                               lambda api: join_background_flight(api, lambda: api.get_channel_content('42')))
+    assert [item.id for item in content] == ['clip']
+
+
+def test_interactive_caller_raises_login_batch(config, monkeypatch, tmp_path):
+    channel_id = run_rate_limited(config, monkeypatch, tmp_path,
+                                  lambda api: join_background_flight(api, lambda: api.get_channel_id('someone')))
+    assert channel_id == '42'
+
+
+def test_raised_priority_sleeps_until_the_bucket_refills(config):
+    limiter = so_bot.HelixRateLimiter(config)
+
+    async def acquire_raised():
+        priority = so_bot.HelixPriority(so_bot.HelixRateLimiter.BACKGROUND)
+        priority.raise_to(so_bot.HelixRateLimiter.INTERACTIVE)
+        limiter.remaining = 0
+        limiter.reset_at = time.time() + 0.3
+        await limiter.acquire(priority)
+
+    asyncio.run(acquire_raised())
+    assert limiter.waits < 5
+
+
+def test_interactive_waits_work_on_separate_event_loops(config):
+    limiter = so_bot.HelixRateLimiter(config)
+
+    async def acquire_interactive():
+        limiter.remaining = 0
+        limiter.reset_at = time.time() + 0.1
+        await limiter.acquire(so_bot._helix_priority.get())
+
+    asyncio.run(acquire_interactive())
+    asyncio.run(acquire_interactive())
+    assert limiter.waits >= 2
@@ -0,0 +1,27 @@
+import so_bot
+
+
+def open_queue(config):
+    journal = so_bot.QueueJournal(config)
+    queue = so_bot.PlaybackQueue(config, journal)
+    queue.restore(journal.open())
+    return queue, journal
+
+
+def test_high_priority_moves_a_normal_channel_and_survives_restart(config, tmp_path):
+    config.config['QUEUE_JOURNAL_PATH'] = str(tmp_path / "journal.jsonl")
+    queue, journal = open_queue(config)
+    assert queue.push('first') == ('queued', 1)
+    assert queue.push('Second') == ('queued', 2)
+    assert queue.push('third', 'high') == ('queued', 1)
+    assert queue.push('second', 'high') == ('moved', 2)
+    assert queue.push('second', 'high') == ('duplicate', 2)
+    assert queue.push('third') == ('duplicate', 1)  # A lower priority never moves a channel down
+    expected = [('third', 'high'), ('Second', 'high'), ('first', 'normal')]
+    assert [(item['channel'], item['priority']) for item in queue.snapshot()['items']] == expected
+    assert len(queue) == 3
+    journal.close()
+
+    restored, journal = open_queue(config)
+    assert [(item['channel'], item['priority']) for item in restored.snapshot()['items']] == expected
+    journal.close()
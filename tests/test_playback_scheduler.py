@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import pytest
+
+import so_bot
+
+BACKGROUND = so_bot.HelixRateLimiter.BACKGROUND
+INTERACTIVE = so_bot.HelixRateLimiter.INTERACTIVE
+
+
+class FakeOBS:
+    def __init__(self):
+        self.played = []
+        self.idle = threading.Event()
+
+    def create_browser_source(self, url):
+        self.idle.clear()
+        self.played.append(url)
+
+    def remove_browser_source(self, *args):
+        self.idle.set()
+
+
+@pytest.fixture
+def scheduler(config, tmp_path):
+    config.config.update({'QUEUE_JOURNAL_PATH': None, 'PLAYER_PAGE': False, 'PREFETCH_DEPTH': 2})
+    api = so_bot.TwitchAPI(config, so_bot.TokenManager(config, str(tmp_path / "tokens.yaml")))
+    api.start()
+    scheduler = so_bot.PlaybackScheduler(config, api, FakeOBS())
+    scheduler.resolutions = []
+    scheduler.background_delays = {}
+
+    async def resolve_channel(channel):
+        level = so_bot._helix_priority_level()
+        scheduler.resolutions.append((channel, level))
+        if level == BACKGROUND:
+            await asyncio.sleep(scheduler.background_delays.get(channel, 0))
+        return so_bot.ContentItem(channel, 'clip', 0.2)
+
+    scheduler.resolve_channel = resolve_channel
+    yield scheduler
+    api.close()
+
+
+def play_all(scheduler, channels, count):
+    scheduler.enqueue(channels)
+    for _ in range(100):
+        if len(scheduler.obs_controller.played) == count and scheduler.obs_controller.idle.wait(0.1):
+            return
+        threading.Event().wait(0.05)
+    raise AssertionError(f"played {scheduler.obs_controller.played}")
+
+
+def test_idle_queue_resolves_head_at_interactive_priority(scheduler):
+    play_all(scheduler, ['first'], 1)
+    assert scheduler.resolutions == [('first', INTERACTIVE)]
+
+
+def test_prefetches_only_channels_behind_the_playing_one(scheduler):
+    play_all(scheduler, ['first', 'second', 'third'], 3)
+    assert scheduler.resolutions == [('first', INTERACTIVE), ('second', BACKGROUND), ('third', BACKGROUND)]
+
+
+def test_unfinished_prefetch_is_resolved_again_interactively(scheduler):
+    scheduler.background_delays['second'] = 5.0  # Still resolving when the first item ends
+    play_all(scheduler, ['first', 'second'], 2)
+    assert scheduler.resolutions == [('first', INTERACTIVE), ('second', BACKGROUND), ('second', INTERACTIVE)]
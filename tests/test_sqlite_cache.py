@@ -0,0 +1,25 @@
+import time
+
+import so_bot
+
+
+def cached_content(config, tmp_path, store=None):
+    """Start an API on the cache database, optionally store a content list, and return what it loaded for it"""
+    api = so_bot.TwitchAPI(config, so_bot.TokenManager(config, str(tmp_path / "tokens.yaml")))
+    api.start()
+    try:
+        content = api._content_cache.get('42')
+        if store is not None:
+            api.run(api._store.set('content', '42', [item.to_tuple() for item in store], time.time() + 3600))
+        return content
+    finally:
+        api.close()
+
+
+def test_content_settings_edited_between_runs_drop_stored_content(config, tmp_path):
+    config.config.update({'CACHE_BACKEND': 'sqlite', 'CACHE_DB_PATH': str(tmp_path / "cache.db"), 'MAX_VIDEO_TIME': '30'})
+    cached_content(config, tmp_path, store=[so_bot.ContentItem('clip', 'clip', 28.0)])
+    assert [item.id for item in cached_content(config, tmp_path)] == ['clip']
+
+    config.config['MAX_VIDEO_TIME'] = '12'  # As if config.yaml was edited while the bot was stopped
+    assert cached_content(config, tmp_path) is None
@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+import yaml
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import so_bot
+
+
+def test_concurrent_get_valid_token_refreshes_once(config, tmp_path, monkeypatch):
+    tokens_path = tmp_path / "tokens.yaml"
+    tokens_path.write_text(yaml.dump({
+        'access_token': 'expired',
+        'refresh_token': 'refresh',
+        'expires_at': time.time() - 10
+    }))
+    refreshes = []
+
+    async def token_endpoint(request):
+        refreshes.append(await request.post())
+        await asyncio.sleep(0.05)  # Keep the refresh in flight while the other callers arrive
+        return web.json_response({'access_token': 'fresh', 'refresh_token': 'refresh2', 'expires_in': 3600})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post('/oauth2/token', token_endpoint)
+        async with TestServer(app) as server:
+            monkeypatch.setattr(so_bot, 'TWITCH_TOKEN_URL', str(server.make_url('/oauth2/token')))
+            manager = so_bot.TokenManager(config, str(tokens_path))
+            return await asyncio.gather(*(manager.get_valid_token() for _ in range(20)))
+
+    results = asyncio.run(scenario())
+
+    assert len(refreshes) == 1
+    assert refreshes[0]['grant_type'] == 'refresh_token'
+    assert results == ['fresh'] * 20
+    assert yaml.safe_load(tokens_path.read_text())['access_token'] == 'fresh'
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+from twitchio.ext import commands
+
+import so_bot
+
+
+class FakeTokenManager:
+    async def run_refresh_scheduler(self, on_refresh=None):
+        await asyncio.sleep(3600)
+
+
+def test_failed_start_cancels_token_refresh_scheduler(config, monkeypatch):
+    async def failing_start(self):
+        raise ConnectionError("login failed")
+
+    monkeypatch.setattr(commands.Bot, 'start', failing_start)
+
+    async def scenario():
+        bot = so_bot.TwitchBot('token', config, FakeTokenManager(), None, None)
+        with pytest.raises(ConnectionError):
+            await bot.start()
+        await asyncio.sleep(0)
+        return bot._token_refresh_task.cancelled()  # asyncio.run would cancel it on exit anyway
+
+    assert asyncio.run(scenario())